@@ -0,0 +1,237 @@
+import argparse
+import sys
+import gc
+import os
+import glob
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+import numpy
+
+from PIL import Image
+from factory import SolverFactory
+from generator import MazeGenerator
+from solving import load_maze, solve_loaded_maze, handle_maze_solution
+
+## Benchmark harness: runs every solver over every bundled maze (plus larger generated ones) and times each phase separately
+## Every solution is checked against the matching image in solved_mazes/, so a speedup can't silently break correctness
+
+PHASES = ["load", "construct", "solve", "render"]
+
+def get_arguments():
+	parser = argparse.ArgumentParser(description="Benchmark the maze solvers per phase: image load, Maze construction, solve and render")
+
+	parser.add_argument("--mazes", default="mazes", help="Directory of maze images to benchmark")
+	parser.add_argument("--solutions", default="solved_mazes", help="Directory of reference solutions to verify against")
+	parser.add_argument("--methods", nargs="+", default=SolverFactory.METHODS, help="Solve methods to benchmark")
+	parser.add_argument("--models", nargs="+", default=["nodes", "grid"], choices=["nodes", "grid"], help="Maze models to benchmark")
+	parser.add_argument("--compress", action="store_true", help="Also benchmark every configuration with junction graph compression")
+	parser.add_argument("--upscale", nargs="*", type=int, default=[2], help="Also benchmark the largest bundled maze upscaled by these factors")
+	parser.add_argument("--generate", nargs="*", type=int, default=[], help="Also benchmark procedurally generated square mazes of these sizes (in pixels)")
+	parser.add_argument("--seed", type=int, default=1, help="Random seed for the generated mazes")
+	parser.add_argument("--repeat", type=int, default=1, help="Run every configuration this many times and report the fastest timings")
+	parser.add_argument("--no-memory", action="store_true", help="Skip the (slower) pass measuring peak memory per phase")
+	parser.add_argument("-o", "--output", help="Write the results as JSON to this file")
+	parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+
+	return parser.parse_args()
+
+def get_benchmark_mazes(maze_directory, solution_directory, upscale_factors, generate_sizes, seed, working_directory):
+	# List of (name, maze image path, reference solution path or None)
+	mazes = []
+	for maze_path in sorted(glob.glob(os.path.join(maze_directory, "*.png"))):
+		solution_path = os.path.join(solution_directory, os.path.basename(maze_path))
+		mazes.append((os.path.basename(maze_path), maze_path, solution_path if os.path.isfile(solution_path) else None))
+
+	# Generated mazes have no reference solution, their paths are cross-checked between configurations instead
+	for size in generate_sizes:
+		name = "generated_%dx%d_seed%d.png" % (size, size, seed)
+		maze_path = os.path.join(working_directory, name)
+		MazeGenerator(size, size, seed=seed).save(maze_path)
+		mazes.append((name, maze_path, None))
+
+	bundled_mazes = [maze for maze in mazes if not maze[1].startswith(working_directory)]
+	if not bundled_mazes or not upscale_factors:
+		return mazes
+
+	# Generate larger mazes by scaling up the largest bundled one, the scaled-up reference solution stays valid for it
+	largest_name, largest_path, largest_solution_path = max(bundled_mazes, key=lambda maze: os.path.getsize(maze[1]))
+	for factor in upscale_factors:
+		name = "%s_x%d.png" % (os.path.splitext(largest_name)[0], factor)
+		maze_path = os.path.join(working_directory, name)
+		upscale_image(largest_path, maze_path, factor)
+
+		solution_path = None
+		if largest_solution_path:
+			solution_path = os.path.join(working_directory, "solution_" + name)
+			upscale_image(largest_solution_path, solution_path, factor)
+
+		mazes.append((name, maze_path, solution_path))
+
+	return mazes
+
+def upscale_image(image_path, output_image_path, factor):
+	image = Image.open(image_path)
+	image.resize((image.size[0] * factor, image.size[1] * factor), Image.NEAREST).save(output_image_path, "PNG")
+
+def get_path_mask(image):
+	# The path is drawn in colour on a black-and-white maze: any pixel whose channels differ is part of the path
+	pixels = numpy.asarray(image.convert("RGB"))
+	return (pixels != pixels[:, :, :1]).any(axis=2)
+
+def verify_path(path, solution_path, image_size):
+	# Compare which pixels the path covers, not their exact colours: that is what tells whether the route is the same
+	if path == False:
+		return False
+	if not solution_path:
+		return None
+
+	mask = numpy.zeros((image_size[1], image_size[0]), dtype=bool)
+	for node in path:
+		mask[node.original_y:node.original_y + node.height, node.original_x:node.original_x + node.width] = True
+
+	return bool(numpy.array_equal(mask, get_path_mask(Image.open(solution_path))))
+
+def run_phases(maze_path, output_image_path, method, model, compress, measure_memory):
+	# Returns the per-phase measurements and the solution path; with measure_memory, peak traced memory is recorded instead of time
+	measurements = {}
+	state = {}
+
+	def load():
+		state["image"] = Image.open(maze_path)
+		state["image"].load()
+
+	def construct():
+		state["maze"] = load_maze(state["image"], model)
+
+	def solve():
+		state["path"] = solve_loaded_maze(state["maze"], method, compress)
+
+	def render():
+		handle_maze_solution(state["path"], state["image"], output_image_path)
+
+	if measure_memory:
+		tracemalloc.start()
+
+	for phase, run in zip(PHASES, [load, construct, solve, render]):
+		if phase == "render" and state["path"] == False:
+			break
+
+		gc.collect()
+		if measure_memory:
+			tracemalloc.reset_peak()
+			run()
+			measurements[phase] = tracemalloc.get_traced_memory()[1]
+		else:
+			start_time = time.perf_counter()
+			run()
+			measurements[phase] = time.perf_counter() - start_time
+
+	if measure_memory:
+		tracemalloc.stop()
+
+	if os.path.exists(output_image_path):
+		os.remove(output_image_path)
+
+	return measurements, state["path"], state["image"].size
+
+def run_benchmark(args):
+	results = []
+	# Path lengths per maze, used to verify mazes without a reference solution: every configuration has to find a path this short
+	reference_path_lengths = {}
+
+	with tempfile.TemporaryDirectory() as working_directory:
+		output_image_path = os.path.join(working_directory, "output.png")
+
+		for name, maze_path, solution_path in get_benchmark_mazes(args.mazes, args.solutions, args.upscale, args.generate, args.seed, working_directory):
+			for model in args.models:
+				for method in args.methods:
+					for compress in ([False, True] if args.compress else [False]):
+						result = {"maze": name, "method": method, "model": model, "compress": compress, "phases": {}}
+
+						try:
+							for repetition in range(args.repeat):
+								timings, path, image_size = run_phases(maze_path, output_image_path, method, model, compress, False)
+								for phase, seconds in timings.items():
+									if phase not in result["phases"] or result["phases"][phase]["seconds"] > seconds:
+										result["phases"][phase] = {"seconds": seconds}
+
+							if not args.no_memory:
+								peaks, path, image_size = run_phases(maze_path, output_image_path, method, model, compress, True)
+								for phase, peak in peaks.items():
+									result["phases"][phase]["peak_memory"] = peak
+
+							result["width"], result["height"] = image_size
+							result["path_length"] = len(path) if path != False else None
+							result["verified"] = verify_path(path, solution_path, image_size)
+							if result["verified"] is None:
+								result["verified"] = reference_path_lengths.setdefault(name, len(path)) == len(path)
+						except Exception as e:
+							result["error"] = "%s: %s" % (type(e).__name__, e)
+
+						result["total_seconds"] = sum(phase["seconds"] for phase in result["phases"].values())
+						results.append(result)
+						print_result(result)
+
+	return {
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+		"python": platform.python_version(),
+		"platform": platform.platform(),
+		"results": results
+	}
+
+def get_configuration_key(result):
+	return (result["maze"], result["method"], result["model"], result["compress"])
+
+def print_result(result, baseline_result = None):
+	configuration = "%-28s %-14s %-6s%s" % (result["maze"], result["method"], result["model"], " compressed" if result["compress"] else "")
+	if "error" in result:
+		print ("%s  ERROR %s" % (configuration, result["error"]))
+		return
+
+	phases = []
+	for phase in PHASES:
+		if phase not in result["phases"]:
+			continue
+
+		measurement = "%s %.3fs" % (phase, result["phases"][phase]["seconds"])
+		if "peak_memory" in result["phases"][phase]:
+			measurement += " (%.1fMB)" % (result["phases"][phase]["peak_memory"] / 1024 / 1024)
+		if baseline_result and phase in baseline_result["phases"] and result["phases"][phase]["seconds"] > 0:
+			measurement += " x%.2f" % (baseline_result["phases"][phase]["seconds"] / result["phases"][phase]["seconds"])
+		phases.append(measurement)
+
+	verified = {True: "verified", False: "WRONG PATH", None: "unverified"}[result["verified"]]
+	print ("%s  %s  [%s]" % (configuration, "  ".join(phases), verified))
+
+def print_comparison(report, baseline_report):
+	# Speedup factors per phase relative to the baseline run (higher is faster)
+	baseline_results = { get_configuration_key(result): result for result in baseline_report["results"] }
+
+	print ("\nCompared to baseline from %s:" % baseline_report["timestamp"])
+	for result in report["results"]:
+		baseline_result = baseline_results.get(get_configuration_key(result))
+		if baseline_result and "error" not in baseline_result:
+			print_result(result, baseline_result)
+
+def main():
+	args = get_arguments()
+	report = run_benchmark(args)
+
+	if args.output:
+		with open(args.output, "w") as output_file:
+			json.dump(report, output_file, indent=2)
+
+	if args.baseline:
+		with open(args.baseline) as baseline_file:
+			print_comparison(report, json.load(baseline_file))
+
+	# Exit with a failure status when any solution was wrong, so this can gate changes
+	if any(result.get("verified") == False or "error" in result for result in report["results"]):
+		sys.exit(1)
+
+# Run the main method if ran from the command line
+if __name__ == "__main__":
+	main()
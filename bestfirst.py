@@ -0,0 +1,111 @@
+import math
+from node import Node
+from stats import SearchStats
+from grid import GridMaze
+from junction import JunctionGraph
+
+## The search loop of Dijkstra's Algorithm and A*, shared by every maze model
+## The model is only seen through get_edges(cell), which yields (neighbour, cost, parent) for every traversable neighbour of cell, in top, right, bottom, left order -
+## parent is what gets remembered for neighbour when it is reached from cell, for the model's own get_path() to backtrack
+## get_heuristic(cell) estimates the remaining distance to the destination, without one this is Dijkstra's Algorithm
+## Returns the parents of all reached cells when the destination was reached, None when it could not be
+def search(initial, destination, get_edges, get_heuristic = None, stats = None):
+	# Construct an initial state - no cell has been visited and every cell, apart from the initial cell, gets a default infinite distance from the initial cell
+	# The state lives in dicts/sets local to this search: only cells that were actually reached take up memory, and the maze itself is never modified
+	distances = { initial: 0 }
+	parents = {}
+	visited = set()
+
+	current = initial
+	# nodes_under_consideration represent the cells that are open to consideration, ordered by their priority
+	nodes_under_consideration = SearchStats.create_queue(stats)
+
+	# While we are not at the end yet AND while we still have a cell to consider..
+	while current is not None and current != destination:
+		current_distance = distances[current]
+
+		for neighbour, cost, parent in get_edges(current):
+			# Cells that have already been visited have their shortest distance already
+			if neighbour in visited:
+				continue
+
+			# Calculate the new distance and set this distance if it's lower than the last set distance for this path
+			# Set this neighbour's parent so that we can backtrack the path later ascendingly
+			new_distance = current_distance + cost
+			if distances.get(neighbour, math.inf) > new_distance:
+				distances[neighbour] = new_distance
+				parents[neighbour] = parent
+
+				# Add (or re-prioritise) this neighbour in the cells we wish to move to next
+				priority = new_distance if get_heuristic is None else new_distance + get_heuristic(neighbour)
+				nodes_under_consideration.push(neighbour, priority)
+
+		# The current cell has now been fully assessed and will never be considered again
+		visited.add(current)
+
+		# Obtain the cell with the smallest priority and consider this one next
+		current = nodes_under_consideration.pop()
+
+	if stats is not None:
+		stats.add_expanded(len(visited))
+
+	if current == destination:
+		return parents
+
+	return None
+
+## Runs search() on any maze model: start and end are cells of the maze (see Maze.get_cell), by default the maze's own entrance and exit
+## With use_heuristic, the Manhattan distance to the end guides the search (A*) - every step costs at least 1, so it never overestimates
+## Returns the path as Nodes, without the start and with the end, or False when there is none
+def solve_maze(maze, start = None, end = None, use_heuristic = False, stats = None):
+	if isinstance(maze, JunctionGraph) and (start is not None or end is not None):
+		raise ValueError("A junction graph can only be solved between the start and end it was built for")
+
+	initial = start if start is not None else maze.get_start_cell()
+	destination = end if end is not None else maze.get_end_cell()
+	get_coordinates = maze.get_cell_coordinates
+
+	if isinstance(maze, GridMaze):
+		# get_neighbours() already leaves out walls and out-of-bounds cells
+		get_edges = lambda index: [(neighbour, 1, index) for neighbour in maze.get_neighbours(index)]
+		get_path = maze.get_path
+	elif isinstance(maze, JunctionGraph):
+		# Every edge costs the length of its corridor, remember the corridor taken as well, so the path can be expanded back into cells
+		get_edges = lambda junction: [(neighbour, length, (junction, corridor)) for neighbour, length, corridor in maze.get_edges(junction)]
+		get_path = maze.get_path
+	else:
+		# The node model is searched by Node.index, Nodes compare and hash by their coordinates, which takes a lot longer
+		nodes = maze.get_nodes()
+		initial = initial.index
+		destination = destination.index
+		get_coordinates = lambda index: (nodes[index].x, nodes[index].y)
+		get_edges = lambda index: [(neighbour.index, 1, index) for neighbour in nodes[index].get_neighbours() if neighbour is not None and neighbour.type != Node.WALL]
+		get_path = lambda parents, destination: get_node_path(nodes, parents, destination)
+
+	get_heuristic = None
+	if use_heuristic:
+		destination_x, destination_y = get_coordinates(destination)
+
+		def get_heuristic(cell):
+			x, y = get_coordinates(cell)
+			return abs(destination_x - x) + abs(destination_y - y)
+
+	parents = search(initial, destination, get_edges, get_heuristic, stats)
+
+	# Sha-bang - We found a solution! Return the path for the caller to handle
+	if parents is not None:
+		return get_path(parents, destination)
+
+	# Aww, no solution could be found.. Either an unsolvable maze or I suck at programming
+	return False
+
+def get_node_path(nodes, parents, destination_index):
+	# Traverse the parent indices end-to-start and build a start-to-end list from it
+	path = []
+	index = destination_index
+	while index in parents:
+		path.append(nodes[index])
+		index = parents[index]
+
+	path.reverse()
+	return path
@@ -0,0 +1,89 @@
+import math
+from junction import JunctionGraph
+
+class Bidirectional:
+	def __init__(self):
+		a = 1
+
+	def get_path(self, meeting_point, forward_parents, backward_parents):
+		# Walk from the meeting point back to the start, then from the meeting point on to the end
+		path = []
+		current = meeting_point
+		while current is not None:
+			path.append(current)
+			current = forward_parents[current]
+
+		path.reverse()
+
+		current = backward_parents[meeting_point]
+		while current is not None:
+			path.append(current)
+			current = backward_parents[current]
+
+		# Like the other solvers, the start node itself is not part of the path
+		return path[1:]
+
+	## Bidirectional breadth-first search: every move costs 1, so searching from the start and the end at the same time
+	## and stopping where both searches meet explores roughly half the area a single search would
+	## For in-depth information, see: https://en.wikipedia.org/wiki/Bidirectional_search
+	def solve(self, maze, start = None, end = None, stats = None):
+		# Breadth-first search assumes every step costs the same, which does not hold for the weighted corridors of a JunctionGraph
+		if isinstance(maze, JunctionGraph):
+			maze = maze.get_maze()
+		
+		initial = start if start is not None else maze.get_start_cell()
+		destination = end if end is not None else maze.get_end_cell()
+		
+		path = self.search(initial, destination, maze.get_open_neighbours, stats)
+		if path == False:
+			return False
+
+		return [maze.get_cell_node(cell) for cell in path]
+
+	def search(self, initial, destination, get_neighbours, stats = None):
+		# Search state is kept per search rather than on the nodes, so nothing needs cleaning up afterwards
+		forward = { "parents": { initial: None }, "distances": { initial: 0 }, "frontier": [initial] }
+		backward = { "parents": { destination: None }, "distances": { destination: 0 }, "frontier": [destination] }
+
+		if initial == destination:
+			return self.get_path(initial, forward["parents"], backward["parents"])
+
+		while forward["frontier"] and backward["frontier"]:
+			# Always grow the side with the smallest frontier by one full level
+			if len(forward["frontier"]) <= len(backward["frontier"]):
+				current, other = forward, backward
+			else:
+				current, other = backward, forward
+
+			meeting_point = None
+			shortest_distance = math.inf
+			next_frontier = []
+
+			for node in current["frontier"]:
+				for neighbour in get_neighbours(node):
+					if neighbour in current["parents"]:
+						continue
+
+					current["parents"][neighbour] = node
+					current["distances"][neighbour] = current["distances"][node] + 1
+					next_frontier.append(neighbour)
+
+					# The searches met - finish the level, another meeting point on it may still be closer to the other side
+					if neighbour in other["distances"]:
+						distance = current["distances"][neighbour] + other["distances"][neighbour]
+						if distance < shortest_distance:
+							shortest_distance = distance
+							meeting_point = neighbour
+
+			# Only once per level, so searching without stats does not pay for them
+			if stats is not None:
+				stats.add_expanded(len(current["frontier"]))
+				stats.add_frontier(len(next_frontier) + len(other["frontier"]), len(next_frontier))
+
+			if meeting_point is not None:
+				return self.get_path(meeting_point, forward["parents"], backward["parents"])
+
+			current["frontier"] = next_frontier
+
+		# One side ran out of nodes to explore without meeting the other, so there is no path
+		return False
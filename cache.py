@@ -0,0 +1,126 @@
+import os
+import glob
+import shutil
+import hashlib
+import tempfile
+import numpy
+from node import Node
+from grid import GridMaze
+
+## Content-addressed on-disk cache: entries are keyed by the SHA-256 of the input image (plus solve method for solutions)
+## Stores the parsed grid, the solved path and the rendered output image, so a repeat request skips as much work as possible
+## The cache is kept under max_size bytes by evicting the least recently used entries, every hit refreshes an entry's modification time
+class SolutionCache:
+	def __init__(self, directory, max_size):
+		self.directory = directory
+		self.max_size = max_size
+
+		os.makedirs(directory, exist_ok=True)
+
+	@staticmethod
+	def get_image_hash(image_path):
+		digest = hashlib.sha256()
+		with open(image_path, "rb") as image_file:
+			for chunk in iter(lambda: image_file.read(1024 * 1024), b""):
+				digest.update(chunk)
+
+		return digest.hexdigest()
+
+	def get_entry_path(self, image_hash, name):
+		return os.path.join(self.directory, image_hash + "-" + name)
+
+	def get_solution_name(self, solve_method, compress):
+		# Compressed searches may pick a different (equally short) path, so they are cached separately
+		return (solve_method or "default") + ("-compressed" if compress else "")
+
+	def use_entry(self, entry_path):
+		# Returns the entry path on a hit, marking it as most recently used
+		if not os.path.isfile(entry_path):
+			return None
+
+		os.utime(entry_path)
+		return entry_path
+
+	def store_entry(self, entry_path, write):
+		# Write to a temporary file first so concurrent readers (e.g. batch workers) never see half-written entries
+		file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+		try:
+			with os.fdopen(file_descriptor, "wb") as entry_file:
+				write(entry_file)
+			os.replace(temporary_path, entry_path)
+		except BaseException:
+			# The file may be gone already, which must not hide the error that got us here
+			try:
+				os.remove(temporary_path)
+			except FileNotFoundError:
+				pass
+			raise
+
+		self.evict()
+
+	def evict(self):
+		entries = []
+		for entry_path in glob.glob(os.path.join(self.directory, "*")):
+			# Entries other writers are still writing (see store_entry) aren't in the cache yet
+			if entry_path.endswith(".tmp"):
+				continue
+
+			try:
+				entry_stat = os.stat(entry_path)
+			except FileNotFoundError:
+				continue
+			entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+		total_size = sum(size for modified, size, entry_path in entries)
+
+		# Least recently used entries go first
+		for modified, size, entry_path in sorted(entries):
+			if total_size <= self.max_size:
+				break
+
+			try:
+				os.remove(entry_path)
+			except FileNotFoundError:
+				pass
+			total_size -= size
+
+	def get_grid(self, image_hash):
+		entry_path = self.use_entry(self.get_entry_path(image_hash, "grid.npz"))
+		if not entry_path:
+			return None
+
+		return GridMaze.load(entry_path)
+
+	def put_grid(self, image_hash, grid):
+		self.store_entry(self.get_entry_path(image_hash, "grid.npz"), grid.save)
+
+	def get_path(self, image_hash, solve_method, compress):
+		# Returns the cached path as a list of Nodes, False for a cached unsolvable maze, or None when not cached
+		entry_path = self.use_entry(self.get_entry_path(image_hash, self.get_solution_name(solve_method, compress) + ".path.npz"))
+		if not entry_path:
+			return None
+
+		with numpy.load(entry_path) as data:
+			if not data["solved"]:
+				return False
+
+			return [Node.from_path_row(row) for row in data["path"].tolist()]
+
+	def put_path(self, image_hash, solve_method, compress, path):
+		# One row of six int32 values per node: model coordinates, then the original pixel rectangle
+		rows = [node.get_path_row() for node in path] if path != False else []
+		path_data = numpy.array(rows, dtype=numpy.int32).reshape(-1, 6)
+
+		entry_path = self.get_entry_path(image_hash, self.get_solution_name(solve_method, compress) + ".path.npz")
+		self.store_entry(entry_path, lambda entry_file: numpy.savez_compressed(entry_file, path=path_data, solved=path != False))
+
+	def get_rendered(self, image_hash, solve_method, compress):
+		return self.use_entry(self.get_entry_path(image_hash, self.get_solution_name(solve_method, compress) + ".png"))
+
+	def put_rendered(self, image_hash, solve_method, compress, rendered_image_path):
+		def copy_rendered_image(entry_file):
+			with open(rendered_image_path, "rb") as rendered_image_file:
+				shutil.copyfileobj(rendered_image_file, entry_file)
+
+		entry_path = self.get_entry_path(image_hash, self.get_solution_name(solve_method, compress) + ".png")
+		self.store_entry(entry_path, copy_rendered_image)
@@ -0,0 +1,102 @@
+import numpy
+import hashlib
+from collections import deque
+
+## One-to-all shortest path index towards a single target cell (by default the maze's exit)
+## A single breadth-first search backwards from the target stores, for every cell, its distance to the target and the direction of its next step
+## After that, the path from any start cell is found by following the directions, in time proportional to the length of the path
+## Every step in the maze costs the same, so breadth-first search yields the same distances Dijkstra would
+class DistanceField:
+	UNREACHABLE = -1
+
+	# Directions in Node.SIDES order (top, right, bottom, left), as (x, y) steps
+	DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+	def __init__(self, maze, target = None):
+		self.maze = maze
+		self.target = target if target is not None else maze.get_end_cell()
+
+		# Per cell: distance to the target and next step direction (an index into DIRECTIONS), -1 for unreachable cells and the target itself
+		self.distances = numpy.full(maze.get_cell_count(), self.UNREACHABLE, dtype=numpy.int32)
+		self.directions = numpy.full(maze.get_cell_count(), self.UNREACHABLE, dtype=numpy.int8)
+
+		self.calculate()
+
+	def calculate(self):
+		maze = self.maze
+		distances = self.distances
+		directions = self.directions
+
+		distances[maze.get_cell_index(self.target)] = 0
+		queue = deque([self.target])
+		while queue:
+			cell = queue.popleft()
+			cell_distance = int(distances[maze.get_cell_index(cell)])
+			x, y = maze.get_cell_coordinates(cell)
+
+			for neighbour in maze.get_open_neighbours(cell):
+				neighbour_index = maze.get_cell_index(neighbour)
+				if distances[neighbour_index] != self.UNREACHABLE:
+					continue
+
+				# The neighbour's next step leads back to the cell it was reached from
+				neighbour_x, neighbour_y = maze.get_cell_coordinates(neighbour)
+				distances[neighbour_index] = cell_distance + 1
+				directions[neighbour_index] = self.DIRECTIONS.index((x - neighbour_x, y - neighbour_y))
+				queue.append(neighbour)
+
+	def get_distance(self, cell):
+		# Number of steps from cell to the target, None when the target can't be reached from there
+		distance = int(self.distances[self.maze.get_cell_index(cell)])
+		return distance if distance != self.UNREACHABLE else None
+
+	def get_path(self, start = None):
+		# Same format as the solvers: the path excludes the start and includes the target, False when there is no path
+		start = start if start is not None else self.maze.get_start_cell()
+		if self.get_distance(start) is None:
+			return False
+
+		directions = memoryview(self.directions)
+
+		path = []
+		cell = start
+		x, y = self.maze.get_cell_coordinates(cell)
+		while cell != self.target:
+			step_x, step_y = self.DIRECTIONS[directions[self.maze.get_cell_index(cell)]]
+			x, y = x + step_x, y + step_y
+			cell = self.maze.get_cell(x, y)
+			path.append(self.maze.get_cell_node(cell))
+
+		return path
+
+	@staticmethod
+	def get_maze_digest(maze):
+		# Fingerprint of which cells are open, a field is only valid on the walls it was calculated for
+		open_grid = maze.get_open_grid()
+		return hashlib.sha256(numpy.array(open_grid.shape, dtype=numpy.int64).tobytes() + numpy.packbits(open_grid).tobytes()).hexdigest()
+
+	def save(self, file):
+		# The target is stored by its coordinates, the maze digest guards against loading the field onto a different maze
+		numpy.savez_compressed(file,
+			distances=self.distances,
+			directions=self.directions,
+			target=numpy.array(self.maze.get_cell_coordinates(self.target), dtype=numpy.int64),
+			cell_count=self.maze.get_cell_count(),
+			maze_digest=numpy.array(self.get_maze_digest(self.maze))
+		)
+
+	@staticmethod
+	def load(file, maze):
+		# Counterpart of save(), the field is attached to the (same) maze it was calculated on
+		with numpy.load(file) as data:
+			# Fields saved before the digest was stored can't be verified, they are rejected as well
+			if int(data["cell_count"]) != maze.get_cell_count() or "maze_digest" not in data or str(data["maze_digest"]) != DistanceField.get_maze_digest(maze):
+				raise ValueError("The distance field in '%s' was calculated for a different maze" % file)
+
+			field = DistanceField.__new__(DistanceField)
+			field.maze = maze
+			field.target = maze.get_cell(*data["target"].tolist())
+			field.distances = data["distances"]
+			field.directions = data["directions"]
+
+		return field
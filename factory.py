@@ -1,11 +1,32 @@
 from dijkstra import Dijkstra;
 from astar import AStar;
+from bidirectional import Bidirectional;
+from jps import JumpPointSearch;
+from parallel import ParallelBreadthFirst;
+from kernel import GridKernelSolver;
 
 class SolverFactory:
+	METHODS = ["dijkstra", "astar", "bidirectional", "jps", "parallel"]
+	
 	def create(self, method_name):
+		solver = self.create_regular(method_name)
+		
+		# Dijkstra and A* search the grid model with the array kernel, compiled when Numba is installed
+		if isinstance(solver, (Dijkstra, AStar)):
+			return GridKernelSolver(solver, isinstance(solver, AStar))
+		
+		return solver
+	
+	def create_regular(self, method_name):
 		if method_name == "dijkstra":
 			return Dijkstra()
 		elif method_name == "astar":
 			return AStar()
+		elif method_name == "bidirectional":
+			return Bidirectional()
+		elif method_name == "jps":
+			return JumpPointSearch()
+		elif method_name == "parallel":
+			return ParallelBreadthFirst()
 		else:
 			return AStar()
\ No newline at end of file
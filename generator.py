@@ -0,0 +1,139 @@
+import argparse
+import random
+
+from utility import GenericUtility
+from streaming import write_png
+
+## Seeded generator for perfect mazes (exactly one route between any two rooms) in the pixel format Maze understands:
+## walls are 0, paths are 255, rooms of empty_size pixels are separated by walls of wall_size pixels,
+## with a single entrance on the top row and a single exit on the bottom row
+## Rooms are generated one row at a time (Eller's algorithm) and pixel rows are streamed straight to disk,
+## so memory use only depends on the width of the maze, not its height
+## For in-depth information, see: http://www.neocomputer.org/projects/eller.html
+class MazeGenerator:
+	WALL = 0
+	EMPTY = 255
+
+	def __init__(self, width, height, wall_size = 2, empty_size = 14, seed = None):
+		if wall_size < 1 or empty_size < 1:
+			raise ValueError("Wall and empty sizes have to be at least 1 pixel")
+
+		# Fit as many rooms as possible: every room takes up a wall and an empty slot, plus one closing wall at the end
+		self.rooms_x = (width - wall_size) // (wall_size + empty_size)
+		self.rooms_y = (height - wall_size) // (wall_size + empty_size)
+		if self.rooms_x < 1 or self.rooms_y < 1:
+			raise ValueError("A %sx%s maze can't fit a single room with these wall/empty sizes" % (width, height))
+
+		self.wall_size = wall_size
+		self.empty_size = empty_size
+		self.width = self.rooms_x * (wall_size + empty_size) + wall_size
+		self.height = self.rooms_y * (wall_size + empty_size) + wall_size
+		self.random = random.Random(seed)
+
+	def create_pixel_row(self, openings, room_pixel):
+		# One pixel row of a band: walls between rooms (open where openings says so), room_pixel for the rooms themselves
+		# For a wall band, openings are the rooms connected downwards and the wall posts between them always stay closed
+		row = bytearray()
+		for x in range(self.rooms_x):
+			row += bytes([room_pixel if room_pixel == self.EMPTY and x > 0 and openings[x - 1] else self.WALL]) * self.wall_size
+			row += bytes([self.EMPTY if room_pixel == self.EMPTY or openings[x] else self.WALL]) * self.empty_size
+		row += bytes([self.WALL]) * self.wall_size
+
+		return bytes(row)
+
+	def generate_rows(self):
+		# Top border: all wall, apart from the entrance
+		entrance_x = self.random.randrange(self.rooms_x)
+		entrance = [x == entrance_x for x in range(self.rooms_x)]
+		yield from [self.create_pixel_row(entrance, self.WALL)] * self.wall_size
+
+		# Rooms in the same set are connected; every room starts out in a set of its own
+		room_sets = list(range(self.rooms_x))
+		next_set = self.rooms_x
+
+		for y in range(self.rooms_y):
+			last_row = y == self.rooms_y - 1
+
+			# Randomly join neighbouring rooms that aren't connected yet - on the last row, join everything that's left
+			merged_sets = {}
+			def find_set(room_set):
+				while room_set in merged_sets:
+					room_set = merged_sets[room_set]
+				return room_set
+
+			open_to_right = [False] * self.rooms_x
+			for x in range(self.rooms_x - 1):
+				left_set = find_set(room_sets[x])
+				right_set = find_set(room_sets[x + 1])
+				if left_set != right_set and (last_row or self.random.random() < 0.5):
+					open_to_right[x] = True
+					merged_sets[right_set] = left_set
+
+			room_sets = [find_set(room_set) for room_set in room_sets]
+			yield from [self.create_pixel_row(open_to_right, self.EMPTY)] * self.empty_size
+
+			if last_row:
+				break
+
+			# Every set continues downwards through at least one of its rooms, otherwise it would be cut off
+			rooms_by_set = {}
+			for x, room_set in enumerate(room_sets):
+				rooms_by_set.setdefault(room_set, []).append(x)
+
+			open_downwards = [False] * self.rooms_x
+			for rooms in rooms_by_set.values():
+				for x in [x for x in rooms if self.random.random() < 0.5] or [self.random.choice(rooms)]:
+					open_downwards[x] = True
+
+			yield from [self.create_pixel_row(open_downwards, self.WALL)] * self.wall_size
+
+			# Rooms below a closed wall start a new set of their own
+			for x in range(self.rooms_x):
+				if not open_downwards[x]:
+					room_sets[x] = next_set
+					next_set += 1
+
+		# Bottom border: all wall, apart from the exit
+		exit_x = self.random.randrange(self.rooms_x)
+		exit = [x == exit_x for x in range(self.rooms_x)]
+		yield from [self.create_pixel_row(exit, self.WALL)] * self.wall_size
+
+	def save(self, output_path):
+		# Binary PGM when asked for explicitly, PNG otherwise - both greyscale and written row by row
+		with open(output_path, "wb") as output_file:
+			if output_path.lower().endswith(".pgm"):
+				self.write_pgm(output_file)
+			else:
+				self.write_png(output_file)
+
+	def write_pgm(self, output_file):
+		output_file.write(b"P5\n%d %d\n255\n" % (self.width, self.height))
+		for row in self.generate_rows():
+			output_file.write(row)
+
+	def write_png(self, output_file):
+		write_png(output_file, self.width, self.height, self.generate_rows())
+
+def get_arguments():
+	parser = argparse.ArgumentParser(description="Generate a random maze image, written row by row")
+
+	parser.add_argument("-o", "--output", required=True, type=GenericUtility.file_not_exists, help="Output image path, .png or .pgm")
+	parser.add_argument("--width", type=int, required=True, help="Image width in pixels, rounded down to fit the wall/empty pattern")
+	parser.add_argument("--height", type=int, required=True, help="Image height in pixels, rounded down to fit the wall/empty pattern")
+	parser.add_argument("--wall", type=int, default=2, help="Wall thickness in pixels")
+	parser.add_argument("--empty", type=int, default=14, help="Room (path) size in pixels")
+	parser.add_argument("--seed", type=int, help="Random seed, the same seed and sizes always yield the same maze")
+
+	return parser.parse_args()
+
+def main():
+	args = get_arguments()
+
+	generator = MazeGenerator(args.width, args.height, args.wall, args.empty, args.seed)
+	generator.save(args.output)
+
+	print ("Generated a %dx%d maze (%dx%d rooms) in %s" % (generator.width, generator.height, generator.rooms_x, generator.rooms_y, args.output))
+
+# Run the main method if ran from the command line
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,333 @@
+import math
+import numpy
+from maze import Maze
+from node import Node
+
+## Alternate maze model: instead of one Node object per cell, the compressed cell grid is stored as a single NumPy array
+## Cells are addressed by a flat index (y * grid_width + x), neighbours are found by index arithmetic
+class GridMaze(Maze):
+	WALL = 0
+	EMPTY = 1
+
+	def __init__(self, width, height, pixel_data):
+		empty_pixels = self.get_empty_pixels(width, height, pixel_data)
+
+		self.maze_scale = {	type: {"x": math.inf, "y": math.inf} for type in Node.get_all_node_types()	}
+		self.maze_scale["field"] = {"width": width, "height": height}
+
+		# Scale detection is shared with the Node-based model
+		self.set_maze_scale(empty_pixels)
+
+		self.create_grid(empty_pixels)
+
+		# Same rules as the Node-based model: the entrance is on the top row, the exit on the bottom row
+		self.set_grid_start_end()
+
+	@staticmethod
+	def calculate_cell_offsets(field_length, wall_length, empty_length):
+		# Cells alternate between wall- and empty-sized slots along each axis, starting with a wall at 0,0 (see Maze.create_nodes)
+		offsets = []
+		lengths = []
+
+		position = 0
+		length = wall_length
+		while position < field_length:
+			offsets.append(position)
+			lengths.append(length)
+
+			position += length
+			length = empty_length if length == wall_length else wall_length
+
+		return offsets, lengths
+
+	def create_grid(self, empty_pixels):
+		self.set_cell_offsets()
+
+		# Sample the top-left pixel of every cell
+		self.set_grid(empty_pixels[numpy.ix_(self.row_offsets, self.column_offsets)].astype(numpy.uint8))
+
+	def set_cell_offsets(self):
+		field_width = self.maze_scale["field"]["width"]
+		field_height = self.maze_scale["field"]["height"]
+
+		# Per-column and per-row pixel offsets, used to map cells back onto the original image
+		self.column_offsets, self.column_widths = self.calculate_cell_offsets(field_width, self.maze_scale[Node.WALL]["x"], self.maze_scale[Node.EMPTY]["x"])
+		self.row_offsets, self.row_heights = self.calculate_cell_offsets(field_height, self.maze_scale[Node.WALL]["y"], self.maze_scale[Node.EMPTY]["y"])
+
+	def set_grid(self, grid):
+		# Once built, the grid is read-only: solvers keep their own state, so one GridMaze can serve many searches at once
+		grid.flags.writeable = False
+
+		self.grid = grid
+		self.grid_height, self.grid_width = grid.shape
+
+		# Flat view on the grid. Indexing a NumPy array one element at a time boxes every value into a NumPy scalar, indexing a memoryview over it yields plain ints,
+		# which is a lot faster in a Python loop - the other per-cell loops (Maze construction, JPS, the distance field, the uncompiled kernel) use memoryviews for the same reason
+		self.cells = memoryview(self.grid.reshape(-1))
+
+	def __getstate__(self):
+		# Memoryviews can't be pickled, the flat view on the grid is recreated on unpickling (e.g. in a worker process)
+		state = self.__dict__.copy()
+		del state["cells"]
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self.cells = memoryview(self.grid.reshape(-1))
+
+	@staticmethod
+	def from_band_reader(reader, band_height = 256, grid_file = None):
+		# Streaming construction for images too large to load at once: the image is read band by band (see streaming.py) twice,
+		# once to detect the maze scale and once to sample the cells, never holding more than a single band of pixels
+		# With grid_file (a path or file object), the grid itself is memory-mapped onto disk as well
+		maze = GridMaze.__new__(GridMaze)
+		maze.maze_scale = {	type: {"x": math.inf, "y": math.inf} for type in Node.get_all_node_types()	}
+		maze.maze_scale["field"] = {"width": reader.width, "height": reader.height}
+
+		maze.set_streaming_maze_scale(reader, band_height)
+		maze.set_cell_offsets()
+
+		grid_shape = (len(maze.row_offsets), len(maze.column_offsets))
+		if grid_file is not None:
+			grid = numpy.memmap(grid_file, dtype=numpy.uint8, mode="w+", shape=grid_shape)
+		else:
+			grid = numpy.zeros(grid_shape, dtype=numpy.uint8)
+
+		row_offsets = numpy.array(maze.row_offsets)
+		for band_start, band in reader.read_bands(band_height):
+			empty_pixels = maze.get_empty_pixels(reader.width, len(band), band[:, :, 0])
+
+			# Grid rows whose top pixel row lies within this band
+			first_row, last_row = numpy.searchsorted(row_offsets, [band_start, band_start + len(band)])
+			grid[first_row:last_row] = empty_pixels[numpy.ix_(row_offsets[first_row:last_row] - band_start, maze.column_offsets)]
+
+		maze.set_grid(grid)
+		maze.set_grid_start_end()
+		return maze
+
+	def set_streaming_maze_scale(self, reader, band_height):
+		# Same result as set_maze_scale, but fed one band at a time: row runs lie within a band,
+		# column runs can cross band borders, so every column's last run is carried over into the next band
+		carried_lengths = None
+		carried_is_empty = None
+
+		for band_start, band in reader.read_bands(band_height):
+			empty_pixels = self.get_empty_pixels(reader.width, len(band), band[:, :, 0])
+			self.calculate_maze_scale("x", empty_pixels)
+
+			# Runs per column, in column order - find each column's first and last run
+			run_lengths, run_is_empty = self.calculate_run_lengths(empty_pixels.T)
+			run_counts = (empty_pixels[1:] != empty_pixels[:-1]).sum(axis=0) + 1
+			last_runs = numpy.cumsum(run_counts) - 1
+			first_runs = last_runs - run_counts + 1
+
+			# Runs that neither start nor end at a band border are complete
+			inner_runs = numpy.ones(len(run_lengths), dtype=bool)
+			inner_runs[first_runs] = False
+			inner_runs[last_runs] = False
+			self.store_maze_scale("y", run_lengths[inner_runs], run_is_empty[inner_runs])
+
+			first_lengths = run_lengths[first_runs]
+			first_is_empty = run_is_empty[first_runs]
+			if carried_lengths is not None:
+				# A carried run either continues into this band's first run, or ended at the border
+				continues = carried_is_empty == first_is_empty
+				self.store_maze_scale("y", carried_lengths[~continues], carried_is_empty[~continues])
+				first_lengths = numpy.where(continues, first_lengths + carried_lengths, first_lengths)
+
+			# First runs that are followed by another run in the same band are complete, the last run is carried
+			single_run = run_counts == 1
+			self.store_maze_scale("y", first_lengths[~single_run], first_is_empty[~single_run])
+			carried_lengths = numpy.where(single_run, first_lengths, run_lengths[last_runs])
+			carried_is_empty = run_is_empty[last_runs]
+
+		if carried_lengths is not None:
+			self.store_maze_scale("y", carried_lengths, carried_is_empty)
+
+	def set_grid_start_end(self):
+		self.start_index = None
+		self.end_index = None
+
+		# First empty cell (left-to-right) on the first row
+		for x in range(self.grid_width):
+			if self.cells[x] == self.EMPTY:
+				self.start_index = x
+				break
+
+		# First empty cell (right-to-left) on the last row
+		last_row_index = (self.grid_height - 1) * self.grid_width
+		for x in reversed(range(self.grid_width)):
+			if self.cells[last_row_index + x] == self.EMPTY:
+				self.end_index = last_row_index + x
+				break
+
+		if self.start_index is None:
+			raise ValueError("No maze entrypoint could be identified - they're all walls :o")
+		if self.end_index is None:
+			raise ValueError("No maze exit point could be identified - they're all walls :o")
+
+	def save(self, file):
+		# Compact binary snapshot of the parsed maze: the cell grid plus everything needed to map it back onto the image
+		numpy.savez_compressed(
+			file,
+			grid=self.grid,
+			column_offsets=self.column_offsets,
+			column_widths=self.column_widths,
+			row_offsets=self.row_offsets,
+			row_heights=self.row_heights,
+			field_size=[self.maze_scale["field"]["width"], self.maze_scale["field"]["height"]],
+			wall_scale=[self.maze_scale[Node.WALL]["x"], self.maze_scale[Node.WALL]["y"]],
+			empty_scale=[self.maze_scale[Node.EMPTY]["x"], self.maze_scale[Node.EMPTY]["y"]]
+		)
+
+	@staticmethod
+	def load(file):
+		# Counterpart of save(), restores a GridMaze without touching the original image
+		with numpy.load(file) as data:
+			maze = GridMaze.__new__(GridMaze)
+
+			field_width, field_height = data["field_size"].tolist()
+			wall_x, wall_y = data["wall_scale"].tolist()
+			empty_x, empty_y = data["empty_scale"].tolist()
+			maze.maze_scale = {
+				Node.WALL: {"x": wall_x, "y": wall_y},
+				Node.EMPTY: {"x": empty_x, "y": empty_y},
+				"field": {"width": field_width, "height": field_height}
+			}
+
+			maze.column_offsets = data["column_offsets"].tolist()
+			maze.column_widths = data["column_widths"].tolist()
+			maze.row_offsets = data["row_offsets"].tolist()
+			maze.row_heights = data["row_heights"].tolist()
+
+			maze.set_grid(data["grid"])
+
+		maze.set_grid_start_end()
+		return maze
+
+	def get_neighbours(self, index):
+		# Traversable neighbours in top, right, bottom, left order - the same order as Node neighbours, so ties resolve identically
+		grid_width = self.grid_width
+		cells = self.cells
+		x = index % grid_width
+
+		neighbours = []
+		if index >= grid_width and cells[index - grid_width]:
+			neighbours.append(index - grid_width)
+		if x < grid_width - 1 and cells[index + 1]:
+			neighbours.append(index + 1)
+		if index + grid_width < len(cells) and cells[index + grid_width]:
+			neighbours.append(index + grid_width)
+		if x > 0 and cells[index - 1]:
+			neighbours.append(index - 1)
+
+		return neighbours
+
+	def to_coordinates(self, index):
+		return index % self.grid_width, index // self.grid_width
+
+	def to_index(self, x, y):
+		return y * self.grid_width + x
+
+	def get_node(self, index):
+		# Materialise a single cell as a Node, e.g. for rendering a path
+		x, y = self.to_coordinates(index)
+		type = Node.EMPTY if self.cells[index] == self.EMPTY else Node.WALL
+
+		node = Node(x, y, self.column_widths[x], self.row_heights[y], type)
+		node.set_original_pixel_values(self.column_offsets[x], self.row_offsets[y])
+
+		return node
+
+	def get_path(self, parents, destination_index):
+		# Traverse the parent indices end-to-start and build a start-to-end list of Nodes from it
+		# Like the Node-based solvers, the start cell (which has no parent) is not part of the path
+		path = []
+		index = destination_index
+		while index in parents:
+			path.append(self.get_node(index))
+			index = parents[index]
+
+		path.reverse()
+		return path
+
+	def get_nodes(self):
+		# The whole grid as linked Node objects in row order, walls included, the way Maze keeps them
+		# Only for code written against Maze: this takes as much memory as the Node model, searches should use cell indices instead
+		nodes = [self.get_node(index) for index in range(len(self.cells))]
+		for index, node in enumerate(nodes):
+			node.index = index
+
+			if node.x > 0:
+				left_neighbour = nodes[index - 1]
+				left_neighbour.set_neighbour("right", node)
+				node.set_neighbour("left", left_neighbour)
+
+			if node.y > 0:
+				top_neighbour = nodes[index - self.grid_width]
+				top_neighbour.set_neighbour("bottom", node)
+				node.set_neighbour("top", top_neighbour)
+
+		return nodes
+
+	def get_start_index(self):
+		return self.start_index
+
+	def get_end_index(self):
+		return self.end_index
+
+	def get_start_node(self):
+		return self.get_node(self.start_index)
+
+	def get_end_node(self):
+		return self.get_node(self.end_index)
+
+	## Cell interface, see Maze: here a cell is its flat index
+
+	def get_open_cells(self):
+		return numpy.flatnonzero(self.grid).tolist()
+
+	def get_open_neighbours(self, index):
+		return self.get_neighbours(index)
+
+	def get_start_cell(self):
+		return self.start_index
+
+	def get_end_cell(self):
+		return self.end_index
+
+	def get_cell_coordinates(self, index):
+		return self.to_coordinates(index)
+
+	def get_cell_node(self, index):
+		return self.get_node(index)
+
+	def get_cell(self, x, y):
+		if 0 <= x < self.grid_width and 0 <= y < self.grid_height:
+			return self.to_index(x, y)
+
+		raise ValueError("Cell %s,%s lies outside of the maze" % (x, y))
+
+	def is_open_cell(self, index):
+		return self.cells[index] == self.EMPTY
+
+	def set_cell_open(self, index, is_open):
+		# See Maze.set_cell_open, the grid is only writable for the duration of the edit
+		grid = self.grid
+		try:
+			grid.flags.writeable = True
+		except ValueError:
+			# A view on read-only memory, edit a copy instead
+			grid = grid.copy()
+
+		grid.reshape(-1)[index] = self.EMPTY if is_open else self.WALL
+		self.set_grid(grid)
+
+	def get_open_grid(self):
+		return self.grid == self.EMPTY
+
+	def get_cell_count(self):
+		return len(self.cells)
+
+	def get_cell_index(self, index):
+		return index
@@ -0,0 +1,157 @@
+import math
+import numpy
+
+from priorityqueue import PriorityQueue
+
+## Re-solving a maze between edits without starting over: Lifelong Planning A* (LPA*) between a fixed start and end
+## The g-values (distances from the start) of the previous search are kept; an edit only marks the changed cell and its neighbours as inconsistent,
+## and the next solve() repairs just the part of the search those changes actually affect
+## Cells are given as model coordinates (x, y), like MazeQueries; edits go through set_cell_open() so that the maze itself changes along
+## For in-depth information, see: https://en.wikipedia.org/wiki/Lifelong_Planning_A*
+class IncrementalSolver:
+	def __init__(self, maze, start = None, end = None):
+		self.maze = maze
+
+		open_grid = maze.get_open_grid()
+		self.height, self.width = open_grid.shape
+		self.open_cells = bytearray(open_grid.astype(numpy.uint8).tobytes())
+
+		initial_x, initial_y = maze.get_cell_coordinates(maze.get_cell(*start) if start is not None else maze.get_start_cell())
+		destination_x, destination_y = maze.get_cell_coordinates(maze.get_cell(*end) if end is not None else maze.get_end_cell())
+		self.initial = initial_y * self.width + initial_x
+		self.destination = destination_y * self.width + destination_x
+
+		# The search runs from the start to the end, so both have to be open, and stay open (see set_cell_open)
+		for cell_x, cell_y in [(initial_x, initial_y), (destination_x, destination_y)]:
+			if not self.open_cells[cell_y * self.width + cell_x]:
+				raise ValueError("Cell %s,%s is a wall" % (cell_x, cell_y))
+
+		# Only finite values are stored, every other cell is infinitely far away
+		# g is the distance found by the last expansion of a cell, rhs the distance its neighbours currently offer (one-step lookahead)
+		self.g = {}
+		self.rhs = { self.initial: 0 }
+		self.queue = PriorityQueue()
+		self.queue.push(self.initial, self.calculate_key(self.initial))
+
+		# How the last solve() went: cells expanded, and how many cells the previous searches had settled that did not need expanding again
+		self.report = None
+
+	def get_neighbours(self, cell):
+		# Every neighbour within the maze, walls included, in top, right, bottom, left order
+		x = cell % self.width
+		neighbours = []
+		if cell >= self.width:
+			neighbours.append(cell - self.width)
+		if x < self.width - 1:
+			neighbours.append(cell + 1)
+		if cell + self.width < len(self.open_cells):
+			neighbours.append(cell + self.width)
+		if x > 0:
+			neighbours.append(cell - 1)
+
+		return neighbours
+
+	def calculate_key(self, cell):
+		# Manhattan distance to the end as heuristic, ties go to the cell closest to the start
+		distance = min(self.g.get(cell, math.inf), self.rhs.get(cell, math.inf))
+		distance_from_destination = abs(self.destination % self.width - cell % self.width) + abs(self.destination // self.width - cell // self.width)
+		return (distance + distance_from_destination, distance)
+
+	def update_cell(self, cell):
+		if cell != self.initial:
+			best_distance = math.inf
+			if self.open_cells[cell]:
+				for neighbour in self.get_neighbours(cell):
+					if self.open_cells[neighbour]:
+						best_distance = min(best_distance, self.g.get(neighbour, math.inf) + 1)
+
+			if best_distance < math.inf:
+				self.rhs[cell] = best_distance
+			else:
+				self.rhs.pop(cell, None)
+
+		# Only inconsistent cells, whose distance has to be recalculated, are queued
+		self.queue.remove(cell)
+		if self.g.get(cell, math.inf) != self.rhs.get(cell, math.inf):
+			self.queue.push(cell, self.calculate_key(cell))
+
+	def set_cell_open(self, x, y, is_open):
+		# Turns a wall into an empty square or the other way around, in the maze as well; the work is done by the next solve()
+		cell = y * self.width + x
+		maze_cell = self.maze.get_cell(x, y)
+		if cell == self.initial or cell == self.destination:
+			raise ValueError("Cell %s,%s is the start or end of the search and can't be changed" % (x, y))
+		if bool(self.open_cells[cell]) == is_open:
+			return
+
+		self.maze.set_cell_open(maze_cell, is_open)
+		self.open_cells[cell] = 1 if is_open else 0
+
+		# Only the steps into and out of the cell changed
+		self.update_cell(cell)
+		for neighbour in self.get_neighbours(cell):
+			self.update_cell(neighbour)
+
+	def toggle_cell(self, x, y):
+		self.set_cell_open(x, y, not self.open_cells[y * self.width + x])
+
+	def solve(self, stats = None):
+		# Returns the path like the solvers do (excluding the start, including the end), or False when the end can't be reached
+		settled_count = len(self.g)
+		expanded = set()
+		reexpanded_count = 0
+
+		while True:
+			top_key = self.queue.peek_priority()
+			if top_key is None:
+				break
+
+			destination_g = self.g.get(self.destination, math.inf)
+			if top_key >= self.calculate_key(self.destination) and self.rhs.get(self.destination, math.inf) == destination_g:
+				break
+
+			cell = self.queue.pop()
+			if cell not in expanded:
+				expanded.add(cell)
+				# A cell's g only changes when it is expanded, so a finite one here is left over from an earlier solve
+				reexpanded_count += cell in self.g
+
+			cell_g = self.g.get(cell, math.inf)
+			cell_rhs = self.rhs.get(cell, math.inf)
+			if cell_g > cell_rhs:
+				# A shorter way to the cell was found: settle it, its neighbours may now be reached sooner as well
+				self.g[cell] = cell_rhs
+				for neighbour in self.get_neighbours(cell):
+					self.update_cell(neighbour)
+			else:
+				# The way the cell was reached got longer or vanished: forget its distance and reconsider it along with its neighbours
+				self.g.pop(cell, None)
+				for neighbour in self.get_neighbours(cell) + [cell]:
+					self.update_cell(neighbour)
+
+		reused_count = settled_count - reexpanded_count
+		self.report = {
+			"expanded": len(expanded),
+			"settled_before": settled_count,
+			"reused": reused_count,
+			"reused_fraction": reused_count / settled_count if settled_count else 0.0
+		}
+
+		if stats is not None:
+			stats.add_expanded(len(expanded))
+
+		if self.destination not in self.g:
+			return False
+
+		return self.get_path()
+
+	def get_path(self):
+		# Walk back from the end, every step onto the open neighbour closest to the start (the first one in top, right, bottom, left order on ties)
+		coordinates = []
+		cell = self.destination
+		while cell != self.initial:
+			coordinates.append((cell % self.width, cell // self.width))
+			cell = min((neighbour for neighbour in self.get_neighbours(cell) if self.open_cells[neighbour]), key=lambda neighbour: self.g.get(neighbour, math.inf))
+
+		coordinates.reverse()
+		return [self.maze.get_cell_node(self.maze.get_cell(x, y)) for x, y in coordinates]
@@ -0,0 +1,187 @@
+import math
+import numpy
+from stats import SearchStats
+from junction import JunctionGraph
+
+class JumpPointSearch:
+	def __init__(self):
+		a = 1
+
+	def get_path(self, maze, parents, destination):
+		# Jump points are connected by straight lines, fill in every cell in between
+		# Like the other solvers, the start cell is not part of the path
+		coordinates = []
+		current = destination
+		while current in parents:
+			parent = parents[current]
+			step_x = (current[0] > parent[0]) - (current[0] < parent[0])
+			step_y = (current[1] > parent[1]) - (current[1] < parent[1])
+
+			x, y = current
+			while (x, y) != parent:
+				coordinates.append((x, y))
+				x, y = x - step_x, y - step_y
+
+			current = parent
+
+		coordinates.reverse()
+		return [maze.get_cell_node(maze.get_cell(x, y)) for x, y in coordinates]
+
+	## Jump Point Search on a 4-connected grid where every step costs 1: A* that only puts "jump points" on its queue
+	## Straight runs of cells that offer no better way onward are skipped in one go, instead of queueing every single cell
+	## Canonical paths run vertically first and turn horizontally anywhere, horizontal runs only turn where a wall forces them to
+	## For in-depth information, see: https://en.wikipedia.org/wiki/Jump_point_search
+	def solve(self, maze, start = None, end = None, stats = None):
+		# Jump points need the regular grid of cells, which a JunctionGraph only keeps underneath
+		if isinstance(maze, JunctionGraph):
+			maze = maze.get_maze()
+
+		initial = maze.get_cell_coordinates(start if start is not None else maze.get_start_cell())
+		destination = maze.get_cell_coordinates(end if end is not None else maze.get_end_cell())
+		jumps = JumpTable(maze.get_open_grid(), destination)
+
+		distances = { initial: 0 }
+		parents = {}
+		visited = set()
+
+		current = initial
+		nodes_under_consideration = SearchStats.create_queue(stats)
+
+		while current is not None and current != destination:
+			current_distance = distances[current]
+
+			for direction in self.get_directions(current, parents.get(current), jumps):
+				jump_point = jumps.jump(current, direction)
+				if jump_point is None or jump_point in visited:
+					continue
+
+				# A jump point lies in a straight line from the current one, so the distance between them is a Manhattan distance
+				new_distance = current_distance + abs(jump_point[0] - current[0]) + abs(jump_point[1] - current[1])
+				if distances.get(jump_point, math.inf) > new_distance:
+					distances[jump_point] = new_distance
+					parents[jump_point] = current
+					distance_from_destination = abs(destination[0] - jump_point[0]) + abs(destination[1] - jump_point[1])
+					nodes_under_consideration.push(jump_point, new_distance + distance_from_destination)
+
+			visited.add(current)
+			current = nodes_under_consideration.pop()
+
+		if stats is not None:
+			stats.add_expanded(len(visited))
+
+		if current == destination:
+			return self.get_path(maze, parents, destination)
+
+		return False
+
+	def get_directions(self, point, parent, jumps):
+		# The start looks every way, other jump points only the ways a canonical path can continue from the direction they were reached in
+		if parent is None:
+			return [(0, -1), (1, 0), (0, 1), (-1, 0)]
+
+		x, y = point
+		step_x = (x > parent[0]) - (x < parent[0])
+		step_y = (y > parent[1]) - (y < parent[1])
+
+		if step_y:
+			return [(0, step_y), (-1, 0), (1, 0)]
+
+		# Horizontally, only turn up or down where the cell we came from could not have turned there itself
+		directions = [(step_x, 0)]
+		for side_y in [-1, 1]:
+			if jumps.is_open(x, y + side_y) and not jumps.is_open(x - step_x, y + side_y):
+				directions.append((0, side_y))
+
+		return directions
+
+## Precalculated jumps for JumpPointSearch: for every cell and direction, where a jump from that cell stops - at a wall, or at a jump point
+## Jump points only depend on the walls, so every jump is a single lookup instead of a walk over the cells; only the destination is checked separately
+## The tables are flat arrays over the grid padded with a border of walls, so a jump can never run off the grid
+class JumpTable:
+	def __init__(self, open_cells, destination):
+		height, width = open_cells.shape
+		self.width = width + 2
+		self.destination = destination
+
+		padded = numpy.pad(open_cells.astype(bool), 1)
+		above = numpy.roll(padded, 1, axis=0)
+		below = numpy.roll(padded, -1, axis=0)
+		left = numpy.roll(padded, 1, axis=1)
+		right = numpy.roll(padded, -1, axis=1)
+
+		# Forced neighbours: an open side that the previous cell in the direction of travel did not have
+		forced_right = padded & ((above & ~numpy.roll(above, 1, axis=1)) | (below & ~numpy.roll(below, 1, axis=1)))
+		forced_left = padded & ((above & ~numpy.roll(above, -1, axis=1)) | (below & ~numpy.roll(below, -1, axis=1)))
+		forced_down = padded & ((left & ~numpy.roll(left, 1, axis=0)) | (right & ~numpy.roll(right, 1, axis=0)))
+		forced_up = padded & ((left & ~numpy.roll(left, -1, axis=0)) | (right & ~numpy.roll(right, -1, axis=0)))
+
+		# Horizontal runs stop at walls and forced neighbours
+		next_right = self.get_next_stops(~padded | forced_right, 1, True)
+		next_left = self.get_next_stops(~padded | forced_left, 1, False)
+
+		# Vertical runs also stop wherever a horizontal run from the cell ends at a jump point rather than a wall
+		leads_sideways = numpy.take_along_axis(padded, numpy.roll(next_right, -1, axis=1), axis=1) | numpy.take_along_axis(padded, numpy.roll(next_left, 1, axis=1), axis=1)
+		next_down = self.get_next_stops(~padded | forced_down | (padded & leads_sideways), 0, True)
+		next_up = self.get_next_stops(~padded | forced_up | (padded & leads_sideways), 0, False)
+
+		# Flat views, as memoryviews (see GridMaze.set_grid)
+		self.open = memoryview(padded.astype(numpy.uint8).reshape(-1))
+		self.next_right = memoryview(next_right.reshape(-1))
+		self.next_left = memoryview(next_left.reshape(-1))
+		self.next_down = memoryview(next_down.reshape(-1))
+		self.next_up = memoryview(next_up.reshape(-1))
+
+	@staticmethod
+	def get_next_stops(stops, axis, forwards):
+		# For every cell, the position along the axis of the first stop at or beyond it in the direction of travel
+		positions = numpy.arange(stops.shape[axis], dtype=numpy.int32).reshape([-1 if index == axis else 1 for index in range(2)])
+		if forwards:
+			stop_positions = numpy.where(stops, positions, stops.shape[axis])
+			return numpy.ascontiguousarray(numpy.flip(numpy.minimum.accumulate(numpy.flip(stop_positions, axis), axis=axis), axis), dtype=numpy.int32)
+
+		stop_positions = numpy.where(stops, positions, -1)
+		return numpy.ascontiguousarray(numpy.maximum.accumulate(stop_positions, axis=axis), dtype=numpy.int32)
+
+	def is_open(self, x, y):
+		return self.open[(y + 1) * self.width + x + 1] == 1
+
+	def jump(self, point, direction):
+		if direction[1] == 0:
+			return self.jump_horizontally(point[0], point[1], direction[0])
+
+		return self.jump_vertically(point[0], point[1], direction[1])
+
+	def jump_horizontally(self, x, y, step_x):
+		# Padded coordinates are one more than grid coordinates
+		row = (y + 1) * self.width
+		if step_x > 0:
+			stop_x = self.next_right[row + x + 2] - 1
+		else:
+			stop_x = self.next_left[row + x] - 1
+
+		destination_x, destination_y = self.destination
+		if destination_y == y and min(x, stop_x) <= destination_x <= max(x, stop_x) and destination_x != x:
+			return self.destination
+		if self.is_open(stop_x, y):
+			return (stop_x, y)
+
+		return None
+
+	def jump_vertically(self, x, y, step_y):
+		if step_y > 0:
+			stop_y = self.next_down[(y + 2) * self.width + x + 1] - 1
+		else:
+			stop_y = self.next_up[y * self.width + x + 1] - 1
+
+		# The destination is no jump point in the tables: stop on its column, or on its row when a horizontal run from there reaches it
+		destination_x, destination_y = self.destination
+		if min(y, stop_y) <= destination_y <= max(y, stop_y) and destination_y != y:
+			if destination_x == x:
+				return self.destination
+			if destination_y != stop_y and self.jump_horizontally(x, destination_y, 1 if destination_x > x else -1) == self.destination:
+				return (x, destination_y)
+
+		if self.is_open(x, stop_y):
+			return (x, stop_y)
+
+		return None
@@ -0,0 +1,95 @@
+## Compressed view on a maze: only junctions (cells with other than exactly two open neighbours), the start and the end are kept
+## Corridors between two junctions become a single weighted edge that remembers the cells it passes through
+## Works on any maze model offering the cell interface (see Maze), the solvers search it through get_edges()
+class JunctionGraph:
+	def __init__(self, maze, prune_dead_ends = True):
+		self.maze = maze
+		self.start_cell = maze.get_start_cell()
+		self.end_cell = maze.get_end_cell()
+
+		# junction -> list of [neighbouring junction, corridor length, cells in between (in walking order)]
+		self.edges = {}
+
+		self.find_junctions()
+		self.connect_junctions()
+
+		if prune_dead_ends:
+			self.remove_dead_ends()
+
+	def is_junction(self, cell, neighbours):
+		return len(neighbours) != 2 or cell == self.start_cell or cell == self.end_cell
+
+	def find_junctions(self):
+		for cell in self.maze.get_open_cells():
+			if self.is_junction(cell, self.maze.get_open_neighbours(cell)):
+				self.edges[cell] = []
+
+	def connect_junctions(self):
+		# Corridors that were already walked from their other end, as (junction, first corridor cell) pairs
+		walked = set()
+
+		for junction in self.edges:
+			for first_cell in self.maze.get_open_neighbours(junction):
+				if (junction, first_cell) in walked:
+					continue
+
+				# Follow the corridor until we hit the next junction, every cell on the way has exactly one way forward
+				previous_cell = junction
+				current_cell = first_cell
+				corridor = []
+				while current_cell not in self.edges:
+					corridor.append(current_cell)
+					neighbours = self.maze.get_open_neighbours(current_cell)
+					next_cell = neighbours[0] if neighbours[0] != previous_cell else neighbours[1]
+					previous_cell, current_cell = current_cell, next_cell
+
+				# Store the corridor in both directions, and make sure it is not walked again from the other end
+				self.edges[junction].append([current_cell, len(corridor) + 1, corridor])
+				self.edges[current_cell].append([junction, len(corridor) + 1, corridor[::-1]])
+				walked.add((current_cell, previous_cell))
+
+	def remove_dead_ends(self):
+		# A dead end can never be part of the way from the start to the end, remove it and re-check the junction it led to
+		# In a maze without loops, this leaves nothing but the solution
+		dead_ends = [junction for junction, edges in self.edges.items() if len(edges) <= 1]
+		while dead_ends:
+			junction = dead_ends.pop()
+			if junction == self.start_cell or junction == self.end_cell or junction not in self.edges:
+				continue
+
+			for neighbour, length, corridor in self.edges.pop(junction):
+				if neighbour not in self.edges:
+					continue
+
+				self.edges[neighbour] = [edge for edge in self.edges[neighbour] if edge[0] != junction]
+				if len(self.edges[neighbour]) <= 1:
+					dead_ends.append(neighbour)
+
+	def get_maze(self):
+		return self.maze
+
+	def get_edges(self, junction):
+		return self.edges[junction]
+
+	def get_start_cell(self):
+		return self.start_cell
+
+	def get_end_cell(self):
+		return self.end_cell
+
+	def get_cell_coordinates(self, cell):
+		return self.maze.get_cell_coordinates(cell)
+
+	def get_path(self, parents, destination):
+		# parents maps a junction to (previous junction, corridor cells from the previous junction to this one)
+		# Expand every edge back into its corridor cells, yielding the same node path the uncompressed maze would
+		cells = []
+		junction = destination
+		while junction in parents:
+			previous_junction, corridor = parents[junction]
+			cells.append(junction)
+			cells.extend(reversed(corridor))
+			junction = previous_junction
+
+		cells.reverse()
+		return [self.maze.get_cell_node(cell) for cell in cells]
@@ -0,0 +1,160 @@
+import heapq
+import numpy
+
+from grid import GridMaze
+
+## Dijkstra's Algorithm, or A* with the Manhattan distance as heuristic, over the flat cell array of a GridMaze
+## Every step is a loop over plain arrays, which Numba compiles into a tight native loop
+## Expands cells in exactly the order Dijkstra and AStar do: ties are broken in the order cells were first queued, like PriorityQueue does
+## Returns (found, nodes expanded, relaxations, peak frontier); distances, parents, sequences and visited are filled in along the way
+def search_grid(cells, width, initial, destination, use_heuristic, distances, parents, sequences, visited):
+	cell_count = len(cells)
+	destination_x = destination % width
+	destination_y = destination // width
+
+	# Binary heap of (priority, sequence, cell) entries, entries that went stale are skipped when popped
+	heap = [(0, 0, initial)]
+	heap.pop()
+
+	sequence_counter = 0
+	queued = 0
+	expanded = 0
+	relaxations = 0
+	peak_frontier = 0
+
+	distances[initial] = 0
+	current = initial
+	while current != destination:
+		current_distance = distances[current]
+		x = current % width
+
+		# Neighbours in top, right, bottom, left order, like GridMaze.get_neighbours()
+		for side in range(4):
+			if side == 0:
+				neighbour = current - width if current >= width else -1
+			elif side == 1:
+				neighbour = current + 1 if x < width - 1 else -1
+			elif side == 2:
+				neighbour = current + width if current + width < cell_count else -1
+			else:
+				neighbour = current - 1 if x > 0 else -1
+
+			if neighbour == -1 or cells[neighbour] == 0 or visited[neighbour] == 1:
+				continue
+
+			new_distance = current_distance + 1
+			if distances[neighbour] == -1 or distances[neighbour] > new_distance:
+				distances[neighbour] = new_distance
+				parents[neighbour] = current
+
+				priority = new_distance
+				if use_heuristic:
+					priority += abs(destination_x - neighbour % width) + abs(destination_y - neighbour // width)
+
+				# A cell keeps the sequence number of its first insertion
+				sequence = sequences[neighbour]
+				if sequence == -1:
+					sequence = sequence_counter
+					sequences[neighbour] = sequence
+					sequence_counter += 1
+					queued += 1
+
+				heapq.heappush(heap, (priority, sequence, neighbour))
+				relaxations += 1
+				peak_frontier = max(peak_frontier, queued)
+
+		visited[current] = 1
+		expanded += 1
+
+		# Pop the cell with the smallest priority, skipping entries of visited cells and entries superseded by a shorter distance
+		current = -1
+		while heap:
+			priority, sequence, cell = heapq.heappop(heap)
+			if visited[cell] == 1:
+				continue
+
+			current_priority = distances[cell]
+			if use_heuristic:
+				current_priority += abs(destination_x - cell % width) + abs(destination_y - cell // width)
+			if priority == current_priority:
+				current = cell
+				queued -= 1
+				break
+
+		if current == -1:
+			return False, expanded, relaxations, peak_frontier
+
+	return True, expanded, relaxations, peak_frontier
+
+# search_grid compiled by Numba, set on first use
+compiled_search_grid = None
+
+def get_compiled_search_grid():
+	# Numba is optional: without it, the kernel runs as plain Python and this returns search_grid itself
+	# Importing Numba and loading the compiled kernel (cached on disk after the first compile) takes a noticeable moment, so it only happens once a search needs it
+	global compiled_search_grid
+	if compiled_search_grid is None:
+		try:
+			import numba
+			compiled_search_grid = numba.njit(cache=True)(search_grid)
+		except ImportError:
+			compiled_search_grid = search_grid
+
+	return compiled_search_grid
+
+## Solver for the grid model that runs the search on search_grid, and leaves every other maze model to the regular solver
+## The search state takes 13 bytes per cell of the maze, in NumPy arrays allocated for every search - on grids of more than MAX_CELLS cells,
+## the regular solver runs instead, whose state only grows with the cells it reaches
+## Without Numba, and on grids too small to make up for loading it, the same kernel runs as plain Python, which still beats the regular solver's dicts and sets
+class GridKernelSolver:
+	MIN_COMPILED_CELLS = 1 << 20
+	MAX_CELLS = 1 << 26
+
+	def __init__(self, solver, use_heuristic, compiled = None):
+		self.solver = solver
+		self.use_heuristic = use_heuristic
+		# None picks by grid size, False runs the plain Python version even when Numba is installed, e.g. to cross-check the compiled one
+		self.compiled = compiled
+
+	def solve(self, maze, start = None, end = None, stats = None):
+		if not isinstance(maze, GridMaze) or maze.get_cell_count() > self.MAX_CELLS:
+			return self.solver.solve(maze, start, end, stats)
+
+		compiled = self.compiled if self.compiled is not None else maze.get_cell_count() >= self.MIN_COMPILED_CELLS
+		search = get_compiled_search_grid() if compiled else search_grid
+
+		initial_index = start if start is not None else maze.get_start_index()
+		destination_index = end if end is not None else maze.get_end_index()
+
+		cell_count = maze.get_cell_count()
+		distances = numpy.full(cell_count, -1, dtype=numpy.int32)
+		parents = numpy.full(cell_count, -1, dtype=numpy.int32)
+		sequences = numpy.full(cell_count, -1, dtype=numpy.int32)
+		visited = numpy.zeros(cell_count, dtype=numpy.uint8)
+		cells = maze.grid.reshape(-1)
+
+		search_arguments = [cells, maze.grid_width, initial_index, destination_index, self.use_heuristic, distances, parents, sequences, visited]
+		if search is search_grid:
+			# Uncompiled, the kernel runs on memoryviews of the arrays (see GridMaze.set_grid)
+			search_arguments = [memoryview(argument) if isinstance(argument, numpy.ndarray) else argument for argument in search_arguments]
+
+		found, expanded, relaxations, peak_frontier = search(*search_arguments)
+
+		if stats is not None:
+			stats.add_expanded(expanded)
+			stats.relaxations += relaxations
+			stats.peak_frontier = max(stats.peak_frontier, peak_frontier)
+
+		if not found:
+			return False
+
+		# Like the other solvers, the start cell is not part of the path
+		parents = memoryview(parents)
+		path = []
+		index = destination_index
+		while index != initial_index:
+			path.append(maze.get_node(index))
+			index = parents[index]
+
+		path.reverse()
+		return path
@@ -1,10 +1,27 @@
 import argparse
+import asyncio
 import math
+import json
+import cProfile
+import numpy
+import os
+import glob
+import time
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from PIL import Image
-from maze import Maze
+from grid import GridMaze
+from cache import SolutionCache
+from distancefield import DistanceField
+from stats import SearchStats, get_profile_summary
+from streaming import open_band_reader, write_png
+from output import OUTPUT_FORMATS, OUTPUT_EXTENSIONS, get_path_colours
+from solving import load_maze, solve_loaded_maze, handle_maze_solution, write_path_solution, write_maze_solution
+from pipeline import MazePipeline
 from utility import GenericUtility
-from factory import SolverFactory
 
 def get_arguments():
 	parser = argparse.ArgumentParser()
@@ -12,69 +29,317 @@ def get_arguments():
 	parser.add_argument("-m", "--method")
 	parser.add_argument("-i", "--input", type=GenericUtility.file_exists)
 	parser.add_argument("-o", "--output", type=GenericUtility.file_not_exists)
-			
-	return parser.parse_args()
-
-		
-def solve_maze(input_image_path, solve_method):
-	image = Image.open(input_image_path)
+	parser.add_argument("--model", choices=["nodes", "grid"], default="nodes")
+	parser.add_argument("-c", "--compress", action="store_true", help="Collapse corridors and dead ends into a junction graph before solving")
+	parser.add_argument("-s", "--stream", action="store_true", help="Read and write the image band by band for mazes too large to fit in memory, implies the grid model")
 	
-	image_width = image.size[0]
-	image_height = image.size[1]
+	# What to write: the rendered maze, only the path, or a small preview of the solution
+	parser.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="png", help="png renders the solved maze; json, binary and svg write only the path; preview renders the part of the maze around the path, scaled down")
+	parser.add_argument("--preview-size", type=int, default=1024, help="Maximum width and height of a preview in pixels")
 	
-	# Obtain a list of image pixel data where we only fetch the R (in RGB) values (signified by band index 0)
-	# We're not interested in any particular band as we're working solely with black and white
-	# This means we only expect 0 or 255 as values, anything else is invalid as per business rules
-	maze_pixel_data = list(image.getdata(0))
+	# Cache of parsed mazes, solutions and rendered images, keyed by the input image's content
+	parser.add_argument("--cache", help="Directory to cache parsed mazes and solutions in, repeat requests for the same image skip parsing and solving")
+	parser.add_argument("--cache-size", type=int, default=1024, help="Maximum cache size in MB, least recently used entries are evicted first")
 	
-	# Construct the maze, which will create a model for the playingfield, including all squares and their neighbours 
-	maze = Maze(image_width, image_height, maze_pixel_data)
+	# Precomputed one-to-all shortest paths towards the exit, reused for every maze start
+	parser.add_argument("--distance-field", help="File to load the maze's distance field from, or to store it in if it doesn't exist yet; the path is then read from the field instead of searched for")
 	
-	# Construct the solver based on the input method
-	solveFactory = SolverFactory()
-	solver = solveFactory.create(solve_method)
+	# Instrumentation: where does the time go for this maze
+	parser.add_argument("--profile", help="Write per-phase timings and search statistics (nodes expanded, relaxations, peak frontier) as JSON to this file")
+	parser.add_argument("--cprofile", action="store_true", help="Also run under cProfile and add the most expensive functions to the --profile output")
 	
-	# Solve the maze and return the result
-	return solver.solve(maze)
+	# Batch mode: solve many mazes in one process start, spread over a pool of worker processes
+	parser.add_argument("-b", "--batch", help="Directory, glob pattern or manifest file (one image path per line) of mazes to solve")
+	parser.add_argument("-d", "--output-directory", help="Directory to write the solved mazes of a batch to")
+	parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of worker processes used in batch mode")
+	parser.add_argument("--max-in-flight", type=int, help="Maximum number of batch images decoded but not yet written at any time (default: twice the number of workers)")
 	
-def handle_maze_solution(path, original_image_path, output_image_path):
-	image = Image.open(original_image_path)
+	args = parser.parse_args()
+	
+	if args.stream and args.cache:
+		parser.error("--stream can't be combined with --cache")
+	if args.format != "png" and args.cache:
+		parser.error("--format %s can't be combined with --cache, which stores rendered images" % args.format)
+	if args.format == "preview" and args.stream:
+		parser.error("--format preview can't be combined with --stream")
+	if args.cprofile and not args.profile:
+		parser.error("--cprofile requires --profile")
+	if args.profile and (args.cache or args.batch):
+		parser.error("--profile can't be combined with --cache or --batch")
+	if args.distance_field and (args.cache or args.compress or args.batch):
+		parser.error("--distance-field can't be combined with --cache, --compress or --batch")
+	
+	if args.batch:
+		if not args.output_directory:
+			parser.error("--batch requires --output-directory")
+	elif not args.input or not args.output:
+		parser.error("either --input and --output, or --batch and --output-directory are required")
+	
+	return args
+
+		
+def solve_by_distance_field(maze, distance_field_path):
+	# Calculate the field once and store it, every later run only follows it from the start
+	if os.path.isfile(distance_field_path):
+		distance_field = DistanceField.load(distance_field_path, maze)
+	else:
+		distance_field = DistanceField(maze)
+		with open(distance_field_path, "wb") as distance_field_file:
+			distance_field.save(distance_field_file)
 	
-	# Maze could not be solved, exit immediately
+	return distance_field.get_path()
+
+def handle_maze_solution_streaming(path, band_reader, output_image_path, band_height = 256):
+	# Same output as handle_maze_solution, but the input image is read and the output written one band of rows at a time
 	if path == False:
 		print ("Maze could not be solved :-(")
 		return False
+	
+	colours = get_path_colours(path) if path else numpy.empty((0, 3), dtype=numpy.uint8)
+	node_tops = numpy.array([node.original_y for node in path], dtype=numpy.int64)
+	node_bottoms = numpy.array([node.original_y + node.height for node in path], dtype=numpy.int64)
+	
+	# Nodes sorted by their top row, so the nodes overlapping a band can be looked up instead of scanned for
+	nodes_by_top = numpy.argsort(node_tops, kind="stable")
+	sorted_tops = node_tops[nodes_by_top]
+	tallest_node = int((node_bottoms - node_tops).max()) if path else 0
+	
+	def generate_rows():
+		for band_start, band in band_reader.read_bands(band_height):
+			band_end = band_start + len(band)
+			band_pixel_data = band_reader.to_rgb(band)
+			
+			# Nodes overlapping this band, drawn in path order so later nodes still paint over earlier ones
+			first, last = numpy.searchsorted(sorted_tops, [band_start - tallest_node, band_end])
+			candidates = numpy.sort(nodes_by_top[first:last])
+			for index in candidates[node_bottoms[candidates] > band_start].tolist():
+				node = path[index]
+				top = max(node.original_y, band_start) - band_start
+				bottom = min(node.original_y + node.height, band_end) - band_start
+				band_pixel_data[top:bottom, node.original_x:node.original_x + node.width] = colours[index]
+			
+			for row in band_pixel_data:
+				yield row.tobytes()
+	
+	with open(output_image_path, "wb") as output_file:
+		write_png(output_file, band_reader.width, band_reader.height, generate_rows(), colour_type=2)
+
+def solve_maze_streaming(input_image_path, output_image_path, solve_method, compress, distance_field_path = None, stats = None, output_format = "png"):
+	# Neither the image nor the grid is ever held in memory as a whole: the grid is memory-mapped onto a temporary file
+	band_reader = open_band_reader(input_image_path)
+	with tempfile.TemporaryFile() as grid_file:
+		# Reading the image is part of construction here, it is never loaded on its own
+		with SearchStats.measure(stats, "construct"):
+			maze = GridMaze.from_band_reader(band_reader, grid_file=grid_file)
 		
-	# Create a new image based on the input image and load the image pixel data
-	image = image.convert("RGB")
-	image_pixel_data = image.load()
-	
-	# Draw the path in the image as red pixels
-	red_intensity = 255
-	green_intensity = 0
-	intensity_increase = 255 / len(path)
-	for node in path:
-		for x in range(node.original_x, node.original_x + node.width):
-			for y in range(node.original_y, node.original_y + node.height):
-				image_pixel_data[x, y] = (int(red_intensity), int(green_intensity), 0)
-				
-		if green_intensity < 255:
-			green_intensity += intensity_increase * 2.2
+		if distance_field_path:
+			with SearchStats.measure(stats, "solve"):
+				path = solve_by_distance_field(maze, distance_field_path)
 		else:
-			red_intensity -= intensity_increase * 2.2
+			path = solve_loaded_maze(maze, solve_method, compress, stats)
+		
+		# Release the memory map before the file goes away
+		del maze
+	
+	with SearchStats.measure(stats, "render"):
+		if output_format != "png":
+			return write_path_solution(path, (band_reader.width, band_reader.height), output_image_path, output_format) != False
 		
+		return handle_maze_solution_streaming(path, band_reader, output_image_path) != False
+
+def solve_maze_cached(input_image_path, output_image_path, solve_method, compress, cache):
+	image_hash = cache.get_image_hash(input_image_path)
+	
+	# Best case: this exact image was solved and rendered before
+	rendered_image_path = cache.get_rendered(image_hash, solve_method, compress)
+	if rendered_image_path:
+		shutil.copyfile(rendered_image_path, output_image_path)
+		return True
+	
+	image = Image.open(input_image_path)
+	
+	path = cache.get_path(image_hash, solve_method, compress)
+	if path is None:
+		# The cache stores the compact grid model, so that is what we parse into - it yields the same paths as the Node model
+		maze = cache.get_grid(image_hash)
+		if maze is None:
+			maze = load_maze(image, "grid")
+			cache.put_grid(image_hash, maze)
 		
-	# Save the image to the path given path
-	image.save(output_image_path, "PNG")
+		path = solve_loaded_maze(maze, solve_method, compress)
+		cache.put_path(image_hash, solve_method, compress, path)
+	
+	if handle_maze_solution(path, image, output_image_path) == False:
+		return False
+	
+	cache.put_rendered(image_hash, solve_method, compress, output_image_path)
+	return True
+
+def process_maze(input_image_path, output_image_path, solve_method, maze_model, compress, cache = None, stream = False, distance_field_path = None, stats = None, output_format = "png", preview_size = 1024):
+	# Solve and render a single maze, returns whether the maze could be solved
+	# With stats (a SearchStats), the time spent in every phase and the search counters are recorded in it
+	# output_format is one of OUTPUT_FORMATS: the rendered image, the path only, or a preview of at most preview_size pixels wide and high
+	if stream:
+		return solve_maze_streaming(input_image_path, output_image_path, solve_method, compress, distance_field_path, stats, output_format)
+	
+	if cache:
+		return solve_maze_cached(input_image_path, output_image_path, solve_method, compress, cache)
+	
+	# Open the input image once, the decoded pixels are reused for rendering the solution
+	with SearchStats.measure(stats, "load"):
+		image = Image.open(input_image_path)
+		image.load()
+	
+	with SearchStats.measure(stats, "construct"):
+		maze = load_maze(image, maze_model)
+	
+	if distance_field_path:
+		with SearchStats.measure(stats, "solve"):
+			path = solve_by_distance_field(maze, distance_field_path)
+	else:
+		path = solve_loaded_maze(maze, solve_method, compress, stats)
+	
+	with SearchStats.measure(stats, "render"):
+		return write_maze_solution(path, image, output_image_path, output_format, preview_size) != False
+
+def get_batch_input_paths(batch_source):
+	# A directory means every file in it, a file is a manifest listing one image path per line, anything else is a glob pattern
+	if os.path.isdir(batch_source):
+		return sorted(path for path in glob.glob(os.path.join(batch_source, "*")) if os.path.isfile(path))
+	
+	if os.path.isfile(batch_source):
+		with open(batch_source) as manifest:
+			return [line.strip() for line in manifest if line.strip() and not line.startswith("#")]
+	
+	return sorted(glob.glob(batch_source))
+
+def solve_batch_item(input_image_path, output_image_path, solve_method, maze_model, compress, cache, stream = False, output_format = "png", preview_size = 1024):
+	# Runs inside a worker process: never raise, report the outcome so one bad image does not take down the batch
+	result = {"input": input_image_path, "output": output_image_path, "status": "solved", "error": None}
+	start_time = time.perf_counter()
+	
+	try:
+		if os.path.exists(output_image_path):
+			raise FileExistsError("'%s' already exists" % output_image_path)
+		
+		if not process_maze(input_image_path, output_image_path, solve_method, maze_model, compress, cache, stream, output_format=output_format, preview_size=preview_size):
+			result["status"] = "unsolvable"
+	except Exception as e:
+		result["status"] = "failed"
+		result["error"] = "%s: %s" % (type(e).__name__, e)
+	
+	result["seconds"] = time.perf_counter() - start_time
+	return result
+
+def print_batch_result(result):
+	if result["status"] == "failed":
+		print ("[failed] %s (%.2fs): %s" % (result["input"], result["seconds"], result["error"]))
+	else:
+		print ("[%s] %s -> %s (%.2fs)" % (result["status"], result["input"], result["output"], result["seconds"]))
+
+def get_batch_output_path(input_image_path, output_directory, output_format):
+	# Rendered images keep the name of the input, other formats get their own extension
+	output_name = os.path.basename(input_image_path)
+	if output_format != "png":
+		output_name = os.path.splitext(output_name)[0] + OUTPUT_EXTENSIONS[output_format]
+	
+	return os.path.join(output_directory, output_name)
+
+def get_batch_jobs(input_image_paths, output_directory, output_format):
+	# (input, output) path pairs; inputs from different directories can share a name, those are numbered so that no result overwrites another
+	output_image_paths = [get_batch_output_path(input_image_path, output_directory, output_format) for input_image_path in input_image_paths]
+	output_counts = Counter(output_image_paths)
+	taken_paths = set(output_image_paths)
+	
+	jobs = []
+	for input_image_path, output_image_path in zip(input_image_paths, output_image_paths):
+		if output_counts[output_image_path] > 1:
+			stem, extension = os.path.splitext(output_image_path)
+			number = 1
+			while "%s_%d%s" % (stem, number, extension) in taken_paths:
+				number += 1
+			
+			output_image_path = "%s_%d%s" % (stem, number, extension)
+			taken_paths.add(output_image_path)
+			print ("%s shares its name with another maze in the batch, writing it to %s" % (input_image_path, output_image_path))
+		
+		jobs.append((input_image_path, output_image_path))
+	
+	return jobs
+
+def solve_batch(input_image_paths, output_directory, solve_method, maze_model, compress, cache, workers, stream = False, max_in_flight = None, output_format = "png", preview_size = 1024):
+	os.makedirs(output_directory, exist_ok=True)
+	jobs = get_batch_jobs(input_image_paths, output_directory, output_format)
+	
+	if cache is None and not stream:
+		# Overlap decoding and encoding with solving, decoding every image only once
+		results = asyncio.run(MazePipeline(solve_method, maze_model, compress, workers, max_in_flight, output_format, preview_size).run(jobs, print_batch_result))
+	else:
+		# Cached and streamed mazes are handled from start to end by one worker process each
+		results = []
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			futures = {
+				executor.submit(solve_batch_item, input_image_path, output_image_path, solve_method, maze_model, compress, cache, stream, output_format, preview_size): (input_image_path, output_image_path)
+				for input_image_path, output_image_path in jobs
+			}
+			
+			# Report every maze as soon as it is done, in completion order
+			for future in as_completed(futures):
+				try:
+					result = future.result()
+				except Exception as e:
+					# The worker itself died (e.g. killed for running out of memory), taking the maze along - and with a broken pool, every maze after it
+					input_image_path, output_image_path = futures[future]
+					result = {"input": input_image_path, "output": output_image_path, "status": "failed", "error": "%s: %s" % (type(e).__name__, e), "seconds": 0.0}
+				
+				results.append(result)
+				print_batch_result(result)
+	
+	failed_count = sum(1 for result in results if result["status"] == "failed")
+	print ("Processed %d mazes: %d failed, total solve time %.2fs" % (len(results), failed_count, sum(result["seconds"] for result in results)))
+	
+	return results
+	
+def write_profile(args, stats, profiler, solved):
+	report = {
+		"input": args.input,
+		"method": args.method,
+		"model": "grid" if args.stream else args.model,
+		"compress": args.compress,
+		"solved": solved
+	}
+	report.update(stats.to_dict())
+	
+	if profiler:
+		report["cprofile"] = get_profile_summary(profiler)
+	
+	with open(args.profile, "w") as profile_file:
+		json.dump(report, profile_file, indent=2)
 	
 def main():
 	try:
 		args = get_arguments()
-		path = solve_maze(args.input, args.method)
+		cache = SolutionCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+		
+		if args.batch:
+			solve_batch(get_batch_input_paths(args.batch), args.output_directory, args.method, args.model, args.compress, cache, args.workers, args.stream, args.max_in_flight, args.format, args.preview_size)
+			return
+		
+		stats = SearchStats() if args.profile else None
+		profiler = cProfile.Profile() if args.cprofile else None
+		
+		if profiler:
+			profiler.enable()
+		
+		solved = process_maze(args.input, args.output, args.method, args.model, args.compress, cache, args.stream, args.distance_field, stats, args.format, args.preview_size)
 		
-		handle_maze_solution(path, args.input, args.output)
+		if profiler:
+			profiler.disable()
+		if stats:
+			write_profile(args, stats, profiler, solved)
 	except Exception as e: 
-		print (e.strerror)		
+		# OSErrors carry their message in strerror, everything else (e.g. a distance field of another maze) in the exception itself
+		print (getattr(e, "strerror", None) or e)		
 	
 # Run the main method if ran from the command line
 if __name__ == "__main__":
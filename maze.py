@@ -1,6 +1,7 @@
 from itertools import filterfalse
 import math
 import copy
+import numpy
 from node import Node
 
 class Maze:
@@ -10,17 +11,18 @@ class Maze:
 	};
 
 	def __init__(self, width, height, pixel_data):
-		if len(pixel_data) != width * height:
-			raise ValueError("Invalid construction of Maze class: Pixel data length does not equal width * height")
+		# pixel_data may be any flat or 2-D greyscale sequence, preferably a NumPy array/view over the image band so nothing gets copied
+		empty_pixels = self.get_empty_pixels(width, height, pixel_data)
 		
-		self.nodes = {}
+		# Every node in creation order (row by row), a node's position in this list is its Node.index
+		self.nodes = []
 		self.maze_scale = {	type: {"x": math.inf, "y": math.inf} for type in Node.get_all_node_types()	}
 		self.maze_scale["field"] = {"width": width, "height": height}
 		
-		# Calculate the scaling of the maze nodes (walls, traversable field) by assessing the ENTIRE maze. @TODO Could probably improve efficiency here
-		self.set_maze_scale(pixel_data)
+		# Calculate the scaling of the maze nodes (walls, traversable field) by assessing the ENTIRE maze
+		self.set_maze_scale(empty_pixels)
 		
-		start_end_data = self.create_nodes(pixel_data)
+		start_end_data = self.create_nodes(empty_pixels)
 		
 		# Set the start- and end position of the maze, we only support exactly one start and exactly one stop location and passively ignore anything else.
 		# Furthermore: Start and stop positions have to be on the top and bottom, respectively.
@@ -39,67 +41,50 @@ class Maze:
 		return Node.WALL
 		#raise ValueError("Unidentified greyscale color " + str(greyscale) + ", supported colors are: " + ', '.join(str(x) for x in Maze.GREYSCALE_NODETYPES.keys()))
 	
-	def transpose_pixel_data(self, pixel_data, transposition_length):
-		# Transpose the pixel data to enable iterating column by column
-		transposed_pixel_data = []
-		for index, pixel_greyscale in enumerate(pixel_data):
-			axis_coordinate = int(index / transposition_length)
-			
-			# When we've gone through the first row/column, we have everything, because the loop below grabs all pixels in the other axis
-			if (axis_coordinate != 0):
-				break
-			
-			# Obtain and store all pixels in the same column as this one
-			transposed_neighbour_index = index
-			while (transposed_neighbour_index < len(pixel_data)):
-				transposed_pixel_data.append(pixel_data[transposed_neighbour_index])
-				transposed_neighbour_index += transposition_length
+	@staticmethod
+	def get_empty_pixels(width, height, pixel_data):
+		pixels = numpy.asarray(pixel_data)
+		if pixels.size != width * height:
+			raise ValueError("Invalid construction of Maze class: Pixel data length does not equal width * height")
 		
-		return transposed_pixel_data
+		# Threshold the whole image in one go, the same way get_node_type_by_pixel_greyscale does it per pixel: unknown greyscales are walls
+		empty_greyscales = [greyscale for greyscale, type in Maze.GREYSCALE_NODETYPES.items() if type == Node.EMPTY]
+		return numpy.isin(pixels.reshape(height, width), empty_greyscales)
 	
-	def calculate_maze_scale(self, axis, pixel_data, transposition_length):
-		# Assume we always start out with a wall at the left top
-		prev_node_type = Node.WALL
-		prev_counter_axis_coord = 0
+	@staticmethod
+	def calculate_run_lengths(lines):
+		# Split every line (row of the 2-D array) into runs of equal values and return each run's length and value
+		line_count, line_length = lines.shape
 		
-		scale_by_type = { type:1 for type in Node.get_all_node_types() }
+		# A run starts at the beginning of every line and wherever the value differs from the one before it
+		run_starts = numpy.ones(lines.shape, dtype=bool)
+		numpy.not_equal(lines[:, 1:], lines[:, :-1], out=run_starts[:, 1:])
 		
-		# We only support 2-D mazes, so this is easy!
-		counter_axis = "y" if axis == "x" else "x"
+		line_indices, positions = numpy.nonzero(run_starts)
 		
-		for index, pixel_greyscale in enumerate(pixel_data):
-			# Coordinates for each axis, sane even after transposition
-			axes_coords = {
-				axis: index % transposition_length,
-				counter_axis: int(index / transposition_length)
-			}			
-			
-			type = self.get_node_type_by_pixel_greyscale(pixel_greyscale)
-			
-			if prev_node_type == type and prev_counter_axis_coord == axes_coords[counter_axis]:
-				# Still on the same main axis as before + same node type as before: up the sequence
-				scale_by_type[type] += 1
-			else:
-				# We found a new type, or we're at the end of the axis - sequence is complete, store it if it's the lowest sequence yet
-				if self.maze_scale[prev_node_type][axis] > scale_by_type[prev_node_type]:
-					self.maze_scale[prev_node_type][axis] = scale_by_type[prev_node_type]
-				
-				# Reset to 1 because we're starting a new sequence (which this current node is a part of)
-				scale_by_type[prev_node_type] = 1
-						
-			prev_node_type = type
-			prev_counter_axis_coord = axes_coords[counter_axis]
-	
-	def set_maze_scale(self, pixel_data):
-		width = self.maze_scale["field"]["width"]
+		# Runs never span two lines, so the distance between consecutive (flattened) run starts is the run length
+		flat_run_starts = line_indices * line_length + positions
+		run_lengths = numpy.diff(flat_run_starts, append=line_count * line_length)
 		
-		# Interpret the maze row-by-row, then column-by-column (after transposition)
+		return run_lengths, lines[line_indices, positions]
+	
+	def calculate_maze_scale(self, axis, empty_pixels):
+		# The scale of a node type is the shortest uninterrupted run of that type along the given axis
+		run_lengths, run_is_empty = self.calculate_run_lengths(empty_pixels)
+		self.store_maze_scale(axis, run_lengths, run_is_empty)
+
+	def store_maze_scale(self, axis, run_lengths, run_is_empty):
+		for type, type_run_lengths in [(Node.EMPTY, run_lengths[run_is_empty]), (Node.WALL, run_lengths[~run_is_empty])]:
+			if type_run_lengths.size and self.maze_scale[type][axis] > type_run_lengths.min():
+				self.maze_scale[type][axis] = int(type_run_lengths.min())
+	
+	def set_maze_scale(self, empty_pixels):
+		# Interpret the maze row-by-row, then column-by-column (through a transposed view, the pixel data is not copied)
 		# Stores the minimum node sizes for each node type in self.maze_scale, to create Node objects from
-		self.calculate_maze_scale("x", pixel_data, width)
-		y_transposed_pixel_data = self.transpose_pixel_data(pixel_data, width)
-		self.calculate_maze_scale("y", y_transposed_pixel_data, width)
+		self.calculate_maze_scale("x", empty_pixels)
+		self.calculate_maze_scale("y", empty_pixels.T)
 		
-	def create_nodes(self, pixel_data):
+	def create_nodes(self, empty_pixels):
 		# Define some constant values as it relates to the processed maze details, added primarily for readability
 		field_width = self.maze_scale["field"]["width"]
 		field_height = self.maze_scale["field"]["height"]
@@ -120,34 +105,37 @@ class Maze:
 		
 		prev_y = 0
 		
+		# Index of the first node on every model row, to find top neighbours (and cells by coordinates, see get_cell) by
+		# Once all nodes are created, the last entry is the node count, marking the end of the last row
+		self.row_start_indices = [0]
+		
 		pixel_index = 0
 		
-		while pixel_index < len(pixel_data):
-			pixel_greyscale = pixel_data[pixel_index]
+		# Flat view on the thresholded pixels, as a memoryview (see GridMaze.set_grid)
+		empty_pixels = memoryview(empty_pixels.reshape(-1))
+		
+		while pixel_index < len(empty_pixels):
 			
 			x = pixel_index % field_width
 			y = int(pixel_index / field_width)
 			
-			new_node_key = self.to_coord_str(model_x, model_y)
 			# Create a new node for the model_x and model_y. model_x and model_y are not physical-pixel-based but node-based instead.
 			# Retain the original pixel values to be able to convert back into an image later.
-			type = self.get_node_type_by_pixel_greyscale(pixel_greyscale)
+			type = Node.EMPTY if empty_pixels[pixel_index] else Node.WALL
 			
-			node = Node(model_x, model_y, node_width, node_height, type)
+			node = Node(model_x, model_y, node_width, node_height, type, len(self.nodes))
 			node.set_original_pixel_values(x, y)
 			
-			self.nodes[new_node_key] = node
+			self.nodes.append(node)
 			
 			# Attach neighbouring nodes
-			left_neighbour_key = self.to_coord_str(model_x - 1, model_y)
-			if left_neighbour_key in self.nodes:
-				left_neighbour = self.nodes[left_neighbour_key]
+			if model_x > 0:
+				left_neighbour = self.nodes[node.index - 1]
 				left_neighbour.set_neighbour("right", node)
 				node.set_neighbour("left", left_neighbour)
 				
-			top_neighbour_key = self.to_coord_str(model_x, model_y - 1)
-			if top_neighbour_key in self.nodes:
-				top_neighbour = self.nodes[top_neighbour_key]
+			if model_y > 0 and self.row_start_indices[-2] + model_x < self.row_start_indices[-1]:
+				top_neighbour = self.nodes[self.row_start_indices[-2] + model_x]
 				top_neighbour.set_neighbour("bottom", node)
 				node.set_neighbour("top", top_neighbour)
 			
@@ -164,6 +152,7 @@ class Maze:
 				
 				model_y += 1
 				model_x = 0
+				self.row_start_indices.append(len(self.nodes))
 				
 				## Alternate the node height between wall- and empty-space height. The reason for this is based on the way mazes are spaced.
 				## Mazes with spacing typically have a few pixels of "dead room" between two empty spaces, which is where a wall would be injectable.
@@ -178,8 +167,8 @@ class Maze:
 			prev_y = new_y
 		
 		return {
-			"initial": self.nodes["0,0"], 
-			"final": self.nodes[new_node_key]
+			"initial": self.nodes[0], 
+			"final": self.nodes[-1]
 		} 
 
 	def set_maze_start_end(self, start_end_data):
@@ -201,29 +190,71 @@ class Maze:
 				
 			current_node = current_node.get_neighbour("left")
 	
-	def to_coord_str(self, x, y):
-		return str(x) + "," + str(y)
-	
 	def get_nodes(self):
 		return self.nodes
-
+	
 	def get_start_node(self):
 		return self.start_node
 		
 	def get_end_node(self):
 		return self.end_node
 	
+	## Cell interface, shared with GridMaze: a cell is whatever identifies a square in the model (here: the Node itself)
+	## Used by code that keeps its own search state and works the same on every maze model
+	
+	def get_open_cells(self):
+		return [node for node in self.nodes if node.type == Node.EMPTY]
+	
+	def get_open_neighbours(self, node):
+		return [neighbour for neighbour in node.get_neighbours() if neighbour and neighbour.type != Node.WALL]
+	
+	def get_start_cell(self):
+		return self.start_node
+	
+	def get_end_cell(self):
+		return self.end_node
+	
+	def get_cell_coordinates(self, node):
+		return node.x, node.y
+	
+	def get_cell_node(self, node):
+		return node
+	
+	def get_cell(self, x, y):
+		# Inverse of get_cell_coordinates
+		if 0 <= y < len(self.row_start_indices) - 1 and 0 <= x < self.row_start_indices[y + 1] - self.row_start_indices[y]:
+			return self.nodes[self.row_start_indices[y] + x]
+		
+		raise ValueError("Cell %s,%s lies outside of the maze" % (x, y))
+	
+	def is_open_cell(self, node):
+		return node.type == Node.EMPTY
+	
+	def set_cell_open(self, node, is_open):
+		# Turns a wall into an empty square or the other way around, e.g. to re-solve incrementally (see IncrementalSolver)
+		# Searches never expect the maze to change under them, so don't edit while any run
+		node.type = Node.EMPTY if is_open else Node.WALL
+	
+	def get_open_grid(self):
+		# 2-D boolean array of traversable cells, indexed [y, x]
+		return numpy.array([node.type == Node.EMPTY for node in self.nodes], dtype=bool).reshape(len(self.row_start_indices) - 1, -1)
+	
+	def get_cell_count(self):
+		return len(self.nodes)
+	
+	def get_cell_index(self, node):
+		# Cells numbered 0 up to get_cell_count(), for per-cell arrays
+		return node.index
+	
 	## HACKY DEBUGGING METHODS HENCEFORTH ##
 	
 	def debug_neighbour_sanity(self):
 		output_list = [[]]
-		node = self.nodes["0,0"]
+		node = self.nodes[0]
 		node_traversal_direction = "right"
 		
 		while True:
-			if hasattr(node, "visited") and node.visited == True:
-				output = "-"
-			elif node.type == Node.WALL:
+			if node.type == Node.WALL:
 				output = 'X'
 			else:
 				output = ' '
@@ -253,13 +284,11 @@ class Maze:
 	def debug_nodes_chronology_sanity(self):
 		output = ''
 		last_y = 0
-		for key, node in self.nodes.items():
+		for node in self.nodes:
 			if node.y != last_y:
 				output += "\n"
 		
-			if hasattr(node, "visited") and node.visited == True:
-				output += "-"
-			elif node.type == Node.WALL:
+			if node.type == Node.WALL:
 				output += "X"
 			else:
 				output += " "
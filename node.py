@@ -1,12 +1,20 @@
+## A single square of the maze model. Nodes are created by the thousands, so they use __slots__ instead of an instance __dict__,
+## and keep their neighbours in a fixed list of four (top, right, bottom, left) instead of a dict keyed by side names
+## Nodes hold no search state: solvers keep that in per-search lists indexed by Node.index
 class Node:
 	WALL = "wall"
 	EMPTY = "empty"
 	
+	SIDES = ("top", "right", "bottom", "left")
+	SIDE_INDICES = { side: position for position, side in enumerate(SIDES) }
+	
+	__slots__ = ("x", "y", "width", "height", "type", "neighbours", "original_x", "original_y", "index")
+	
 	@staticmethod
 	def get_all_node_types():
 		return [Node.WALL, Node.EMPTY]
 	
-	def __init__(self, x, y, width, height, type):
+	def __init__(self, x, y, width, height, type, index = None):
 		self.validate(x, y, type)
 		
 		self.x = x
@@ -14,7 +22,12 @@ class Node:
 		self.width = width
 		self.height = height
 		self.type = type
-		self.neighbours = { "top": None, "right": None, "bottom": None, "left": None }
+		self.neighbours = [None, None, None, None]
+		self.original_x = None
+		self.original_y = None
+		
+		# Position of this node within its maze, see Maze.get_cell_index() and get_cell_count()
+		self.index = index
 	
 	def validate(self, x, y, type):
 		if x < 0 or y < 0:
@@ -24,17 +37,34 @@ class Node:
 			raise ValueError("Unknown type %s" % type)
 	
 	def set_neighbour(self, side, neighbour_node = None):
-		self.neighbours[side] = neighbour_node
+		self.neighbours[self.SIDE_INDICES[side]] = neighbour_node
 	
 	def set_original_pixel_values(self, original_x, original_y):
 		self.original_x = original_x
 		self.original_y = original_y
+	
+	def get_path_row(self):
+		# Compact form of a path node, e.g. to store it or send it to another process: model coordinates, then the original pixel rectangle
+		# Unlike the Node itself, it does not drag along its neighbours (and through them, the entire maze)
+		return (self.x, self.y, self.original_x, self.original_y, self.width, self.height)
+	
+	@staticmethod
+	def from_path_row(row):
+		x, y, original_x, original_y, width, height = row
+		node = Node(x, y, width, height, Node.EMPTY)
+		node.set_original_pixel_values(original_x, original_y)
+		
+		return node
 		
 	def __eq__(self, other):
 		if not isinstance(other, Node):
-			return NotImplementedError
+			return NotImplemented
 		
 		return self.x == other.x and self.y == other.y
+	
+	def __hash__(self):
+		# Consistent with __eq__: a node is identified by its model coordinates
+		return hash((self.x, self.y))
 		
 	def __str__(self):
 		return "Model: " + str(self.x) + "," + str(self.y) + " -- Original: " + str(self.original_x) + "," + str(self.original_y) + " -- Type: " + self.type
@@ -42,7 +72,7 @@ class Node:
 	## DEBUGGING METHODS HENCEFORTH ##
 	
 	def get_neighbour(self, type):
-		return self.neighbours[type]
+		return self.neighbours[self.SIDE_INDICES[type]]
 	
 	def get_neighbours(self):
 		return self.neighbours
@@ -0,0 +1,113 @@
+import json
+import struct
+import numpy
+
+from PIL import Image
+
+## Output formats for a solved maze besides the full rendered image (see handle_maze_solution in main)
+## The path-only formats never touch the maze image, they only need its size:
+##   json    {"solved", "width", "height", "length", "columns", "path"} with one row of PATH_COLUMNS per square of the path
+##   binary  BINARY_HEADER (magic, image width, image height, number of squares or BINARY_UNSOLVED), then PATH_COLUMNS per square as little-endian uint32
+## Both json and binary also record an unsolvable maze, the json with solved false and the binary with BINARY_UNSOLVED as number of squares
+##   svg     the path as coloured rectangles on a transparent canvas the size of the maze, to lay over the original image
+## preview renders only the part of the maze around the path, scaled down to fit within a given size
+
+OUTPUT_FORMATS = ["png", "json", "binary", "svg", "preview"]
+OUTPUT_EXTENSIONS = { "png": ".png", "json": ".json", "binary": ".bin", "svg": ".svg", "preview": ".png" }
+PATH_FORMATS = ["json", "binary", "svg"]
+
+PATH_COLUMNS = ["x", "y", "original_x", "original_y", "width", "height"]
+BINARY_MAGIC = b"MZP1"
+BINARY_HEADER = struct.Struct("<4sIII")
+# Number of squares of an unsolvable maze: an empty path is a solved maze that starts where it ends
+BINARY_UNSOLVED = 0xFFFFFFFF
+
+def get_path_colours(path):
+	# Gradient from red through yellow to green along the path, one colour per node
+	colours = numpy.empty((len(path), 3), dtype=numpy.float64)
+
+	red_intensity = 255
+	green_intensity = 0
+	intensity_increase = 255 / len(path)
+	for index in range(len(path)):
+		colours[index] = (int(red_intensity), int(green_intensity), 0)
+
+		if green_intensity < 255:
+			green_intensity += intensity_increase * 2.2
+		else:
+			red_intensity -= intensity_increase * 2.2
+
+	# The intensities overshoot 0..255 towards the end of the path, clip them the same way PIL does for out-of-range pixel values
+	return numpy.clip(colours, 0, 255).astype(numpy.uint8)
+
+def get_path_document(path, image_size):
+	# An unsolvable maze (path False) has an empty path
+	rows = [node.get_path_row() for node in path] if path != False else []
+	return {"solved": path != False, "width": image_size[0], "height": image_size[1], "length": len(rows), "columns": PATH_COLUMNS, "path": rows}
+
+def get_path_json(path, image_size):
+	return json.dumps(get_path_document(path, image_size)).encode()
+
+def get_path_binary(path, image_size):
+	if path == False:
+		return BINARY_HEADER.pack(BINARY_MAGIC, image_size[0], image_size[1], BINARY_UNSOLVED)
+
+	rows = numpy.array([node.get_path_row() for node in path], dtype="<u4").reshape(-1, len(PATH_COLUMNS))
+	return BINARY_HEADER.pack(BINARY_MAGIC, image_size[0], image_size[1], len(rows)) + rows.tobytes()
+
+def read_path_binary(data):
+	# Counterpart of get_path_binary(): returns the image size and the path as an array with a row of PATH_COLUMNS per square, False for an unsolvable maze
+	magic, width, height, length = BINARY_HEADER.unpack_from(data)
+	if magic != BINARY_MAGIC:
+		raise ValueError("Not a binary maze path")
+	if length == BINARY_UNSOLVED:
+		return (width, height), False
+
+	rows = numpy.frombuffer(data, dtype="<u4", count=length * len(PATH_COLUMNS), offset=BINARY_HEADER.size)
+	return (width, height), rows.reshape(length, len(PATH_COLUMNS))
+
+def get_path_svg(path, image_size):
+	# Pixel coordinates, so the overlay lines up with the original image when laid over it at the same size
+	width, height = image_size
+	lines = ['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d" shape-rendering="crispEdges">' % (width, height, width, height)]
+
+	colours = get_path_colours(path) if path else []
+	for node, colour in zip(path, colours):
+		lines.append('<rect x="%d" y="%d" width="%d" height="%d" fill="#%02x%02x%02x"/>' % (node.original_x, node.original_y, node.width, node.height, *colour.tolist()))
+
+	lines.append("</svg>")
+	return ("\n".join(lines) + "\n").encode()
+
+def write_path(path, image_size, output_file, output_format):
+	# output_file is a file name or a binary file object
+	data = { "json": get_path_json, "binary": get_path_binary, "svg": get_path_svg }[output_format](path, image_size)
+
+	if isinstance(output_file, str):
+		with open(output_file, "wb") as file:
+			file.write(data)
+	else:
+		output_file.write(data)
+
+def write_preview(path, image, output_file, preview_size = 1024):
+	# Only the bounding box of the path, with a margin of a square on every side, is converted to RGB and drawn on
+	if path:
+		margin_x = max(node.width for node in path)
+		margin_y = max(node.height for node in path)
+		left = max(min(node.original_x for node in path) - margin_x, 0)
+		top = max(min(node.original_y for node in path) - margin_y, 0)
+		right = min(max(node.original_x + node.width for node in path) + margin_x, image.size[0])
+		bottom = min(max(node.original_y + node.height for node in path) + margin_y, image.size[1])
+	else:
+		left, top, right, bottom = 0, 0, image.size[0], image.size[1]
+
+	image_pixel_data = numpy.array(image.crop((left, top, right, bottom)).convert("RGB"))
+
+	if path:
+		colours = get_path_colours(path)
+		for node, colour in zip(path, colours):
+			image_pixel_data[node.original_y - top:node.original_y - top + node.height, node.original_x - left:node.original_x - left + node.width] = colour
+
+	# Averaging keeps paths that end up narrower than a pixel visible as a tint
+	preview = Image.fromarray(image_pixel_data, "RGB")
+	preview.thumbnail((preview_size, preview_size), Image.Resampling.BOX)
+	preview.save(output_file, "PNG")
@@ -0,0 +1,129 @@
+import os
+import numpy
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+from junction import JunctionGraph
+
+class ParallelBreadthFirst:
+	# Levels with a frontier of at least this many cells are split over the worker processes, smaller ones are not worth the round trip
+	PARALLEL_FRONTIER = 1 << 14
+
+	def __init__(self, workers = None):
+		self.workers = workers or os.cpu_count()
+
+	def get_path(self, maze, distances, width, destination):
+		# Walk back from the destination, every step onto a neighbour one step closer to the start (in top, right, bottom, left order)
+		# Like the other solvers, the start cell is not part of the path
+		cell_count = len(distances)
+		coordinates = []
+		current = destination
+		distance = int(distances[current])
+		while distance > 0:
+			coordinates.append((current % width, current // width))
+			x = current % width
+			for neighbour in [current - width, current + 1 if x < width - 1 else -1, current + width, current - 1 if x > 0 else -1]:
+				if 0 <= neighbour < cell_count and distances[neighbour] == distance - 1:
+					current = neighbour
+					break
+
+			distance -= 1
+
+		coordinates.reverse()
+		return [maze.get_cell_node(maze.get_cell(x, y)) for x, y in coordinates]
+
+	## Level-synchronous breadth-first search for a single huge maze, spread over several processes
+	## The open cells and the distance of every reached cell live in shared memory: each level, the workers each expand a part of the frontier,
+	## and the next frontier is formed from what they found. Only this process writes distances, in between levels, so workers never race
+	## Every step costs the same, so the path found is as short as Dijkstra's (though ties may be broken differently)
+	def solve(self, maze, start = None, end = None, stats = None):
+		# The regular grid of cells is what is shared, a JunctionGraph only keeps it underneath
+		if isinstance(maze, JunctionGraph):
+			maze = maze.get_maze()
+
+		initial_x, initial_y = maze.get_cell_coordinates(start if start is not None else maze.get_start_cell())
+		destination_x, destination_y = maze.get_cell_coordinates(end if end is not None else maze.get_end_cell())
+
+		open_grid = maze.get_open_grid()
+		height, width = open_grid.shape
+		initial = initial_y * width + initial_x
+		destination = destination_y * width + destination_x
+
+		open_memory = shared_memory.SharedMemory(create=True, size=open_grid.size)
+		distance_memory = shared_memory.SharedMemory(create=True, size=open_grid.size * 4)
+		executor = None
+		try:
+			open_cells = numpy.ndarray(open_grid.size, dtype=numpy.bool_, buffer=open_memory.buf)
+			open_cells[:] = open_grid.reshape(-1)
+			distances = numpy.ndarray(open_grid.size, dtype=numpy.int32, buffer=distance_memory.buf)
+			distances[:] = -1
+			distances[initial] = 0
+
+			level = 0
+			frontier = numpy.array([initial], dtype=numpy.int64)
+			while len(frontier) and distances[destination] == -1:
+				if len(frontier) >= self.PARALLEL_FRONTIER and self.workers > 1:
+					# The pool is only started once a level is large enough to need it
+					if executor is None:
+						executor = ProcessPoolExecutor(max_workers=self.workers, initializer=attach_shared_grid, initargs=(open_memory.name, distance_memory.name, open_grid.size))
+
+					chunks = numpy.array_split(frontier, self.workers)
+					candidates = numpy.concatenate(list(executor.map(expand_shared_frontier, chunks, [width] * len(chunks))))
+				else:
+					candidates = expand_frontier(frontier, open_cells, distances, width)
+
+				# Several frontier cells can reach the same cell
+				next_frontier = numpy.unique(candidates)
+				level += 1
+				distances[next_frontier] = level
+
+				if stats is not None:
+					stats.add_expanded(len(frontier))
+					stats.add_frontier(len(next_frontier), len(candidates))
+
+				frontier = next_frontier
+
+			if distances[destination] == -1:
+				return False
+
+			return self.get_path(maze, memoryview(distances), width, destination)
+		finally:
+			if executor is not None:
+				executor.shutdown()
+
+			# The arrays must be gone before the memory they point into is closed
+			open_cells = distances = None
+			open_memory.close()
+			open_memory.unlink()
+			distance_memory.close()
+			distance_memory.unlink()
+
+def expand_frontier(frontier, open_cells, distances, width):
+	# Neighbours of the frontier cells that are open and not reached yet - a cell shows up once for every frontier cell next to it
+	x = frontier % width
+	candidates = numpy.concatenate([
+		frontier[frontier >= width] - width,
+		frontier[x < width - 1] + 1,
+		frontier[frontier < len(open_cells) - width] + width,
+		frontier[x > 0] - 1
+	])
+
+	return candidates[open_cells[candidates] & (distances[candidates] == -1)]
+
+# The shared arrays as seen by a worker process, attached once by the pool initializer
+worker_grid = None
+
+def attach_shared_grid(open_name, distance_name, cell_count):
+	global worker_grid
+	open_memory = shared_memory.SharedMemory(name=open_name)
+	distance_memory = shared_memory.SharedMemory(name=distance_name)
+
+	# The memory objects are kept along with the arrays, which would otherwise lose their buffer
+	worker_grid = {
+		"memory": [open_memory, distance_memory],
+		"open_cells": numpy.ndarray(cell_count, dtype=numpy.bool_, buffer=open_memory.buf),
+		"distances": numpy.ndarray(cell_count, dtype=numpy.int32, buffer=distance_memory.buf)
+	}
+
+def expand_shared_frontier(frontier, width):
+	return expand_frontier(frontier, worker_grid["open_cells"], worker_grid["distances"], width)
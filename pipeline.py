@@ -0,0 +1,78 @@
+import os
+import time
+import numpy
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from PIL import Image
+from node import Node
+from solving import create_maze, solve_loaded_maze, write_maze_solution
+
+## Batch solving as an asyncio pipeline: decoding and encoding images happens on a pool of threads (zlib and Pillow release the GIL while they work),
+## building the model and searching on a pool of worker processes, so the next images are decoded and the previous ones written while others are being solved
+## Every input image is decoded exactly once: the worker processes only receive its greyscale pixel array, the decoded image itself stays here for rendering
+## At most max_in_flight images are between decoding and having been written at any time, which bounds memory use however large the batch is
+class MazePipeline:
+	def __init__(self, solve_method, maze_model, compress, workers = None, max_in_flight = None, output_format = "png", preview_size = 1024):
+		self.solve_method = solve_method
+		self.maze_model = maze_model
+		self.compress = compress
+		self.output_format = output_format
+		self.preview_size = preview_size
+		self.workers = workers or os.cpu_count()
+		# By default, every worker process has its next maze ready while it solves the current one
+		self.max_in_flight = max_in_flight or self.workers * 2
+
+	async def run(self, jobs, report = None):
+		# jobs is a list of (input image path, output image path), report is called with every result in completion order
+		self.in_flight = asyncio.Semaphore(self.max_in_flight)
+
+		with ThreadPoolExecutor(max_workers=self.workers) as self.image_pool, ProcessPoolExecutor(max_workers=self.workers) as self.solver_pool:
+			results = []
+			for next_result in asyncio.as_completed([self.process(input_image_path, output_image_path) for input_image_path, output_image_path in jobs]):
+				result = await next_result
+				results.append(result)
+				if report is not None:
+					report(result)
+
+		return results
+
+	async def process(self, input_image_path, output_image_path):
+		# Never raises, the outcome is reported in the same form as the other batch modes
+		result = {"input": input_image_path, "output": output_image_path, "status": "solved", "error": None}
+
+		async with self.in_flight:
+			loop = asyncio.get_running_loop()
+			start_time = time.perf_counter()
+
+			try:
+				if os.path.exists(output_image_path):
+					raise FileExistsError("'%s' already exists" % output_image_path)
+
+				image, maze_pixel_data = await loop.run_in_executor(self.image_pool, decode_image, input_image_path)
+				path_rows = await loop.run_in_executor(self.solver_pool, solve_pixel_data, maze_pixel_data, self.solve_method, self.maze_model, self.compress)
+				path = [Node.from_path_row(row) for row in path_rows] if path_rows != False else False
+
+				if await loop.run_in_executor(self.image_pool, write_maze_solution, path, image, output_image_path, self.output_format, self.preview_size) == False:
+					result["status"] = "unsolvable"
+			except Exception as e:
+				result["status"] = "failed"
+				result["error"] = "%s: %s" % (type(e).__name__, e)
+
+			result["seconds"] = time.perf_counter() - start_time
+
+		return result
+
+def decode_image(input_image_path):
+	# Runs on the image thread pool
+	image = Image.open(input_image_path)
+	image.load()
+
+	return image, numpy.asarray(image.getchannel(0))
+
+def solve_pixel_data(maze_pixel_data, solve_method, maze_model, compress):
+	# Runs in a worker process. Path nodes of the node model link to their neighbours, and through them to the entire maze,
+	# so the path is sent back as rows rather than as Nodes
+	path = solve_loaded_maze(create_maze(maze_pixel_data, maze_model), solve_method, compress)
+
+	return [node.get_path_row() for node in path] if path != False else False
@@ -0,0 +1,54 @@
+import heapq
+import itertools
+
+class PriorityQueue:
+	def __init__(self):
+		# Binary heap of (priority, sequence, item) entries, entries that went stale are skipped when popped (lazy deletion)
+		self.heap = []
+		# Membership index mapping every queued item to its current (priority, sequence), making lookups O(1)
+		self.entries = {}
+		self.sequence_counter = itertools.count()
+	
+	def push(self, item, priority):
+		# An item keeps the sequence number of its first insertion, so ties are broken in insertion order
+		# This mirrors scanning a plain list front-to-back for the smallest priority
+		if item in self.entries:
+			current_priority, sequence = self.entries[item]
+			if current_priority <= priority:
+				return
+		else:
+			sequence = next(self.sequence_counter)
+		
+		self.entries[item] = (priority, sequence)
+		heapq.heappush(self.heap, (priority, sequence, item))
+	
+	def pop(self):
+		# Obtain the item with the smallest priority, or None when the queue is empty
+		while self.heap:
+			priority, sequence, item = heapq.heappop(self.heap)
+			if self.entries.get(item) == (priority, sequence):
+				del self.entries[item]
+				return item
+		
+		return None
+	
+	def peek_priority(self):
+		# The smallest priority in the queue without popping its item, or None when the queue is empty
+		while self.heap:
+			priority, sequence, item = self.heap[0]
+			if self.entries.get(item) == (priority, sequence):
+				return priority
+			
+			heapq.heappop(self.heap)
+		
+		return None
+	
+	def remove(self, item):
+		# The heap entry is left behind and discarded once it reaches the top
+		self.entries.pop(item, None)
+	
+	def __contains__(self, item):
+		return item in self.entries
+	
+	def __len__(self):
+		return len(self.entries)
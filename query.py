@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from grid import GridMaze
+from factory import SolverFactory
+
+## Route queries between arbitrary cells of one loaded maze, solved one by one or many at once on a pool of threads or processes
+## Solvers keep all search state to themselves and never modify the maze, so every query shares the same maze model
+## Cells are given as model coordinates (x, y), see get_cell_coordinates() on the maze; None means the maze's own entrance or exit
+## With a DistanceField, queries towards its target are answered from the field instead of searching
+class MazeQueries:
+	def __init__(self, maze, solve_method = None, distance_field = None):
+		self.maze = maze
+		self.solve_method = solve_method
+		self.distance_field = distance_field
+
+	def get_query_cell(self, coordinates, default_cell):
+		if coordinates is None:
+			return default_cell
+
+		cell = self.maze.get_cell(*coordinates)
+		if not self.maze.is_open_cell(cell):
+			raise ValueError("Cell %s,%s is a wall" % tuple(coordinates))
+
+		return cell
+
+	def solve(self, start = None, end = None):
+		# Returns the path like the solvers do (excluding the start, including the end), or False when end can't be reached
+		start_cell = self.get_query_cell(start, self.maze.get_start_cell())
+		end_cell = self.get_query_cell(end, self.maze.get_end_cell())
+
+		if self.distance_field is not None and end_cell == self.distance_field.target:
+			return self.distance_field.get_path(start_cell)
+
+		solver = SolverFactory().create(self.solve_method)
+		return solver.solve(self.maze, start_cell, end_cell)
+
+	def solve_many(self, queries, workers = None, processes = False):
+		# queries is a list of (start, end) pairs, the paths are returned in the same order
+		# Threads share the maze as is, but only one runs Python code at a time; worker processes search truly in parallel,
+		# each receiving a copy of the maze once when it starts - only the compact grid model can be copied to them
+		queries = list(queries)
+
+		if processes:
+			if not isinstance(self.maze, GridMaze):
+				raise ValueError("Only a GridMaze can be shared with worker processes, use threads or the grid model")
+
+			workers = workers or os.cpu_count()
+			with ProcessPoolExecutor(max_workers=workers, initializer=set_worker_queries, initargs=(self,)) as executor:
+				return list(executor.map(solve_worker_query, queries, chunksize=max(1, len(queries) // (workers * 4))))
+
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			return list(executor.map(lambda query: self.solve(*query), queries))
+
+# The MazeQueries of a worker process, set once by the pool initializer so the maze is not sent along with every query
+worker_queries = None
+
+def set_worker_queries(queries):
+	global worker_queries
+	worker_queries = queries
+
+def solve_worker_query(query):
+	return worker_queries.solve(*query)
@@ -0,0 +1,188 @@
+import argparse
+import io
+import os
+import sys
+import json
+import signal
+import stat
+import threading
+import socketserver
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from PIL import Image
+from solving import load_maze, solve_loaded_maze, handle_maze_solution
+from output import get_path_json
+
+## Long-running solver server: pays interpreter startup and imports once, then solves maze after maze over HTTP
+## Listens on a local TCP port or a Unix socket. Requests are handled by a bounded pool of threads, solving happens in a pool of warm worker processes
+##
+##   POST /solve?method=astar&model=grid&compress=1&format=png   body: the maze image
+##   POST /solve?image=/path/to/maze.png&format=json             image read from the server's filesystem instead
+##   GET  /health
+##
+## format=png (default) returns the rendered solution, format=json the path as [x, y, pixel x, pixel y, width, height] per square (see output.py)
+
+def solve_request(image_data, image_path, solve_method, maze_model, compress, response_format):
+	# Runs in a worker process, returns (HTTP status, content type, body)
+	image = Image.open(io.BytesIO(image_data) if image_data else image_path)
+	image.load()
+
+	path = solve_loaded_maze(load_maze(image, maze_model), solve_method, compress)
+
+	if response_format == "json":
+		return 200, "application/json", get_path_json(path, image.size)
+
+	if path == False:
+		return 422, "application/json", json.dumps({"solved": False, "error": "Maze could not be solved"}).encode()
+
+	output = io.BytesIO()
+	handle_maze_solution(path, image, output)
+	return 200, "image/png", output.getvalue()
+
+class SolveRequestHandler(BaseHTTPRequestHandler):
+	def address_string(self):
+		# Unix socket clients have no address
+		return self.client_address[0] if self.client_address else "unix"
+
+	def send_body(self, status, content_type, body):
+		self.send_response(status)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def send_error_json(self, status, message):
+		self.send_body(status, "application/json", json.dumps({"error": message}).encode())
+
+	def do_GET(self):
+		if urlparse(self.path).path != "/health":
+			self.send_error_json(404, "Unknown path")
+			return
+
+		self.send_body(200, "application/json", json.dumps({"status": "ok"}).encode())
+
+	def do_POST(self):
+		url = urlparse(self.path)
+		if url.path != "/solve":
+			self.send_error_json(404, "Unknown path")
+			return
+
+		parameters = { name: values[-1] for name, values in parse_qs(url.query).items() }
+		try:
+			content_length = int(self.headers.get("Content-Length", 0))
+			if content_length < 0:
+				raise ValueError("negative length")
+		except ValueError:
+			self.send_error_json(400, "Invalid Content-Length")
+			return
+
+		image_data = self.rfile.read(content_length)
+		image_path = parameters.get("image")
+		response_format = parameters.get("format", "png")
+		maze_model = parameters.get("model", self.server.maze_model)
+
+		if not image_data and not image_path:
+			self.send_error_json(400, "Send the maze image as the request body, or its path in the 'image' parameter")
+			return
+		if response_format not in ["png", "json"] or maze_model not in ["nodes", "grid"]:
+			self.send_error_json(400, "Unknown format or model")
+			return
+
+		try:
+			future = self.server.solver_pool.submit(solve_request, image_data, image_path, parameters.get("method"), maze_model, parameters.get("compress") in ["1", "true"], response_format)
+			status, content_type, body = future.result()
+		except (OSError, ValueError) as e:
+			# Unreadable images and images that are no valid maze
+			self.send_error_json(400, "%s: %s" % (type(e).__name__, e))
+			return
+		except Exception as e:
+			self.send_error_json(500, "%s: %s" % (type(e).__name__, e))
+			return
+
+		self.send_body(status, content_type, body)
+
+## Hands every accepted connection to a fixed pool of threads instead of a new thread per connection
+## When all threads are busy, accepting waits - further clients queue up in the listen backlog rather than in memory
+class PooledServerMixIn:
+	def set_pools(self, workers, maze_model):
+		self.maze_model = maze_model
+		self.request_pool = ThreadPoolExecutor(max_workers=workers)
+		self.request_slots = threading.BoundedSemaphore(workers)
+		self.solver_pool = ProcessPoolExecutor(max_workers=workers)
+
+	def process_request(self, request, client_address):
+		self.request_slots.acquire()
+		self.request_pool.submit(self.process_pooled_request, request, client_address)
+
+	def process_pooled_request(self, request, client_address):
+		try:
+			self.finish_request(request, client_address)
+		except Exception:
+			self.handle_error(request, client_address)
+		finally:
+			self.shutdown_request(request)
+			self.request_slots.release()
+
+	def server_close(self):
+		super().server_close()
+		self.request_pool.shutdown()
+		self.solver_pool.shutdown()
+
+class PooledHTTPServer(PooledServerMixIn, HTTPServer):
+	pass
+
+class PooledUnixHTTPServer(PooledServerMixIn, socketserver.UnixStreamServer):
+	pass
+
+def create_server(host, port, socket_path, workers, maze_model):
+	if socket_path:
+		# A socket file left behind by an earlier server would make binding fail, anything else at that path is not ours to remove
+		if os.path.exists(socket_path):
+			if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+				raise FileExistsError("'%s' exists and is not a socket" % socket_path)
+			os.remove(socket_path)
+		server = PooledUnixHTTPServer(socket_path, SolveRequestHandler)
+	else:
+		server = PooledHTTPServer((host, port), SolveRequestHandler)
+
+	server.set_pools(workers, maze_model)
+	return server
+
+def get_arguments():
+	parser = argparse.ArgumentParser(description="Keep a maze solver running and solve mazes sent to it over HTTP")
+
+	parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+	parser.add_argument("--port", type=int, default=8080, help="TCP port to listen on")
+	parser.add_argument("--socket", help="Listen on this Unix socket instead of a TCP port")
+	parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Number of mazes solved at the same time")
+	parser.add_argument("--model", choices=["nodes", "grid"], default="grid", help="Default maze model, requests may override it")
+
+	return parser.parse_args()
+
+def stop_server(signal_number, frame):
+	# Service managers stop the server with SIGTERM, shut down just like on Ctrl+C
+	sys.exit(0)
+
+def main():
+	args = get_arguments()
+	try:
+		server = create_server(args.host, args.port, args.socket, args.workers, args.model)
+	except FileExistsError as e:
+		sys.exit("Not starting: %s" % e)
+	signal.signal(signal.SIGTERM, stop_server)
+
+	print ("Serving on %s" % (args.socket or "http://%s:%d" % (args.host, args.port)))
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		if args.socket and os.path.exists(args.socket):
+			os.remove(args.socket)
+
+# Run the main method if ran from the command line
+if __name__ == "__main__":
+	main()
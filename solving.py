@@ -0,0 +1,94 @@
+import numpy
+
+from PIL import Image
+from maze import Maze
+from grid import GridMaze
+from junction import JunctionGraph
+from stats import SearchStats
+from output import get_path_colours, write_path, write_preview
+from factory import SolverFactory
+
+## Loading, solving and writing a single maze, shared by the command line (main.py), the batch pipeline and the server
+## Kept apart from main.py so that importing these never runs (or re-imports) the command line itself
+
+def load_maze(image, maze_model = "nodes"):
+	# Obtain the image pixel data where we only fetch the R (in RGB) values (signified by band index 0)
+	# We're not interested in any particular band as we're working solely with black and white
+	# This means we only expect 0 or 255 as values, anything else is invalid as per business rules
+	# The band is handed over as a 2-D uint8 array over the raw band bytes rather than as a list of Python ints, keeping memory use proportional to the image size
+	maze_pixel_data = numpy.asarray(image.getchannel(0))
+	
+	return create_maze(maze_pixel_data, maze_model)
+
+def create_maze(maze_pixel_data, maze_model = "nodes"):
+	# maze_pixel_data is the 2-D greyscale array of the image
+	image_height, image_width = maze_pixel_data.shape
+	
+	# Construct the maze, which will create a model for the playingfield, including all squares and their neighbours 
+	# The grid model keeps the squares in a single NumPy array instead of one Node object per square
+	maze_class = GridMaze if maze_model == "grid" else Maze
+	return maze_class(image_width, image_height, maze_pixel_data)
+
+def solve_loaded_maze(maze, solve_method, compress = False, stats = None):
+	# Optionally search a graph of only the junctions, connected by corridors, instead of every single square
+	if compress:
+		with SearchStats.measure(stats, "compress"):
+			maze = JunctionGraph(maze)
+	
+	# Construct the solver based on the input method
+	solveFactory = SolverFactory()
+	solver = solveFactory.create(solve_method)
+	
+	# Solve the maze and return the result
+	with SearchStats.measure(stats, "solve"):
+		return solver.solve(maze, stats=stats)
+
+def solve_maze(input_image_path, solve_method, maze_model = "nodes", compress = False):
+	maze = load_maze(Image.open(input_image_path), maze_model)
+	
+	return solve_loaded_maze(maze, solve_method, compress)
+	
+def handle_maze_solution(path, original_image, output_image_path):
+	# original_image is either the already-loaded input image or the path to it
+	image = Image.open(original_image) if isinstance(original_image, str) else original_image
+	
+	# Maze could not be solved, exit immediately
+	if path == False:
+		print ("Maze could not be solved :-(")
+		return False
+		
+	# Create a new image based on the input image, as a writable array of RGB pixel data
+	image_pixel_data = numpy.array(image.convert("RGB"))
+	
+	# Draw the path in the image as red pixels, blitting every node's rectangle at once - later nodes paint over earlier ones
+	if path:
+		colours = get_path_colours(path)
+		for node, colour in zip(path, colours):
+			image_pixel_data[node.original_y:node.original_y + node.height, node.original_x:node.original_x + node.width] = colour
+		
+	# Save the image to the path given path
+	Image.fromarray(image_pixel_data, "RGB").save(output_image_path, "PNG")
+
+def write_path_solution(path, image_size, output_path, output_format):
+	# Path-only output, see output.py: the image itself is not needed, only its size
+	# The json and binary documents record an unsolvable maze as well, an svg overlay would have nothing to show
+	if path == False:
+		print ("Maze could not be solved :-(")
+		if output_format in ["json", "binary"]:
+			write_path(path, image_size, output_path, output_format)
+		return False
+	
+	write_path(path, image_size, output_path, output_format)
+
+def write_maze_solution(path, image, output_path, output_format = "png", preview_size = 1024):
+	# Writes the solution in one of the OUTPUT_FORMATS, returns False when the maze could not be solved
+	if output_format == "png":
+		return handle_maze_solution(path, image, output_path)
+	if output_format != "preview":
+		return write_path_solution(path, image.size, output_path, output_format)
+	
+	if path == False:
+		print ("Maze could not be solved :-(")
+		return False
+	
+	write_preview(path, image, output_path, preview_size)
@@ -0,0 +1,78 @@
+import time
+import pstats
+from contextlib import contextmanager, nullcontext
+
+from priorityqueue import PriorityQueue
+
+## Opt-in instrumentation of a solve: wall time per phase (image load, maze construction, solve, ...) and search counters
+## Solvers only take a SearchStats when one is handed to them; without one they run exactly the code they would otherwise
+class SearchStats:
+	def __init__(self):
+		self.phases = {}
+		self.nodes_expanded = 0
+		self.relaxations = 0
+		self.peak_frontier = 0
+
+	@contextmanager
+	def phase(self, name):
+		start_time = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start_time
+
+	@staticmethod
+	def measure(stats, name):
+		# Times the phase when stats are being collected, does nothing otherwise
+		return stats.phase(name) if stats is not None else nullcontext()
+
+	@staticmethod
+	def create_queue(stats):
+		return PriorityQueue() if stats is None else CountingPriorityQueue(stats)
+
+	def add_expanded(self, count):
+		self.nodes_expanded += count
+
+	def add_frontier(self, frontier_size, relaxations):
+		# For searches without a priority queue (e.g. breadth-first levels)
+		self.peak_frontier = max(self.peak_frontier, frontier_size)
+		self.relaxations += relaxations
+
+	def to_dict(self):
+		return {
+			"phases": self.phases,
+			"nodes_expanded": self.nodes_expanded,
+			"relaxations": self.relaxations,
+			"peak_frontier": self.peak_frontier
+		}
+
+## PriorityQueue that reports to a SearchStats: every push that is not ignored is a relaxation (a shorter distance was found),
+## and the number of queued items after it is the frontier size
+class CountingPriorityQueue(PriorityQueue):
+	def __init__(self, stats):
+		super().__init__()
+		self.stats = stats
+
+	def push(self, item, priority):
+		if item in self.entries and self.entries[item][0] <= priority:
+			return
+
+		super().push(item, priority)
+		self.stats.relaxations += 1
+		if len(self.entries) > self.stats.peak_frontier:
+			self.stats.peak_frontier = len(self.entries)
+
+def get_profile_summary(profiler, limit = 30):
+	# The functions that took the most cumulative time, in a JSON-friendly form
+	profile_stats = pstats.Stats(profiler)
+	functions = []
+	for (file_name, line_number, function_name), (primitive_calls, calls, total_time, cumulative_time, callers) in profile_stats.stats.items():
+		functions.append({
+			"function": "%s:%d(%s)" % (file_name, line_number, function_name),
+			"calls": calls,
+			"total_seconds": total_time,
+			"cumulative_seconds": cumulative_time
+		})
+
+	functions.sort(key=lambda function: function["cumulative_seconds"], reverse=True)
+	return functions[:limit]
@@ -0,0 +1,221 @@
+import struct
+import zlib
+import numpy
+
+from PIL import Image
+
+## Band-by-band image access for mazes too large to hold in memory at once
+## A band reader yields (first row, band) pairs where band is a uint8 array of shape (rows, width, channels),
+## keeping no more than one band of pixel rows in memory. Reading again starts over from the top of the file
+
+class PngBandReader:
+	PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+	CHANNELS_BY_COLOUR_TYPE = { 0: 1, 2: 3, 3: 1, 4: 2, 6: 4 }
+
+	def __init__(self, image_path):
+		self.image_path = image_path
+		self.palette = None
+
+		with open(image_path, "rb") as image_file:
+			if image_file.read(8) != self.PNG_SIGNATURE:
+				raise ValueError("'%s' is not a PNG image" % image_path)
+
+			for chunk_type, data in self.read_chunks(image_file):
+				if chunk_type == b"IHDR":
+					self.width, self.height, bit_depth, self.colour_type, compression, filter_method, interlace = struct.unpack(">IIBBBBB", data)
+					if bit_depth != 8 or interlace != 0 or self.colour_type not in self.CHANNELS_BY_COLOUR_TYPE:
+						raise ValueError("Only non-interlaced 8-bit PNG images can be read band by band")
+					self.channels = self.CHANNELS_BY_COLOUR_TYPE[self.colour_type]
+				elif chunk_type == b"PLTE":
+					self.palette = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3)
+				elif chunk_type == b"IDAT":
+					break
+
+	@staticmethod
+	def read_chunks(image_file):
+		while True:
+			header = image_file.read(8)
+			if len(header) < 8:
+				return
+
+			length, chunk_type = struct.unpack(">I4s", header)
+			data = image_file.read(length)
+			image_file.read(4)
+
+			yield chunk_type, data
+			if chunk_type == b"IEND":
+				return
+
+	def unfilter_row(self, filter_type, row, previous_row):
+		# Reverse the PNG scanline filter, see https://www.w3.org/TR/png/#9Filters
+		if filter_type == 0:
+			return row
+		if filter_type == 1:
+			# Sub: a running sum per channel, uint8 arithmetic wraps around just like the filter does
+			return numpy.cumsum(row.reshape(-1, self.channels), axis=0, dtype=numpy.uint8).reshape(-1)
+		if filter_type == 2:
+			return row + previous_row
+
+		# Average and Paeth depend on the pixel that was just decoded, so these have to go pixel by pixel
+		decoded = row.astype(numpy.int32)
+		above = previous_row.astype(numpy.int32)
+		for index in range(len(decoded)):
+			left = decoded[index - self.channels] if index >= self.channels else 0
+			upper_left = above[index - self.channels] if index >= self.channels else 0
+			if filter_type == 3:
+				decoded[index] = (decoded[index] + (left + above[index]) // 2) & 0xFF
+			else:
+				estimate = left + above[index] - upper_left
+				distances = (abs(estimate - left), abs(estimate - above[index]), abs(estimate - upper_left))
+				predictor = left if distances[0] <= distances[1] and distances[0] <= distances[2] else (above[index] if distances[1] <= distances[2] else upper_left)
+				decoded[index] = (decoded[index] + predictor) & 0xFF
+
+		return decoded.astype(numpy.uint8)
+
+	def read_rows(self):
+		stride = self.width * self.channels
+		decompressor = zlib.decompressobj()
+		previous_row = numpy.zeros(stride, dtype=numpy.uint8)
+		pending = b""
+		rows_read = 0
+
+		with open(self.image_path, "rb") as image_file:
+			image_file.read(8)
+			for chunk_type, compressed in self.read_chunks(image_file):
+				if chunk_type != b"IDAT":
+					continue
+
+				while compressed and rows_read < self.height:
+					# Inflate a few rows at a time: maze images compress extremely well, a single chunk can hold many megabytes
+					pending += decompressor.decompress(compressed, 16 * (stride + 1))
+					compressed = decompressor.unconsumed_tail
+
+					# Every scanline is one filter type byte followed by the row's bytes
+					offset = 0
+					while len(pending) - offset > stride and rows_read < self.height:
+						row = numpy.frombuffer(pending, dtype=numpy.uint8, count=stride, offset=offset + 1)
+						previous_row = self.unfilter_row(pending[offset], row, previous_row)
+						offset += stride + 1
+						rows_read += 1
+
+						yield previous_row
+
+					pending = pending[offset:]
+
+	def read_bands(self, band_height):
+		band = []
+		band_start = 0
+		for row in self.read_rows():
+			band.append(row)
+			if len(band) == band_height:
+				yield band_start, numpy.array(band).reshape(len(band), self.width, self.channels)
+				band_start += len(band)
+				band = []
+
+		if band:
+			yield band_start, numpy.array(band).reshape(len(band), self.width, self.channels)
+
+	def to_rgb(self, band):
+		# Same conversion as PIL's convert("RGB"): greyscale is repeated, alpha is dropped, palette indices are looked up
+		if self.colour_type == 3:
+			return self.palette[band[:, :, 0]]
+		if self.channels <= 2:
+			return numpy.repeat(band[:, :, :1], 3, axis=2)
+
+		return numpy.array(band[:, :, :3])
+
+class PgmBandReader:
+	def __init__(self, image_path):
+		self.image_path = image_path
+		self.channels = 1
+
+		with open(image_path, "rb") as image_file:
+			header = image_file.read(1024)
+
+		if not header.startswith(b"P5"):
+			raise ValueError("Only binary 8-bit PGM images can be read band by band")
+
+		# Header: "P5", width, height and maximum value separated by whitespace (comments start with #), then a single whitespace
+		fields = []
+		position = 0
+		while len(fields) < 4:
+			while position < len(header) and header[position:position + 1].isspace():
+				position += 1
+			if header[position:position + 1] == b"#":
+				position = header.find(b"\n", position)
+				if position == -1:
+					break
+				continue
+
+			field_end = position
+			while field_end < len(header) and not header[field_end:field_end + 1].isspace():
+				field_end += 1
+			# A field running up to the end of what was read is cut off (or the header is missing the whitespace after it)
+			if field_end == len(header):
+				break
+			fields.append(header[position:field_end])
+			position = field_end
+
+		if len(fields) < 4:
+			raise ValueError("'%s' has a truncated or malformed PGM header" % self.image_path)
+		if fields[0] != b"P5" or not all(field.isdigit() for field in fields[1:]) or int(fields[3]) > 255:
+			raise ValueError("Only binary 8-bit PGM images can be read band by band")
+
+		self.width = int(fields[1])
+		self.height = int(fields[2])
+		self.data_offset = position + 1
+
+	def read_bands(self, band_height):
+		# Memory-mapped: the operating system pages rows in (and out) as bands are read
+		pixels = numpy.memmap(self.image_path, dtype=numpy.uint8, mode="r", offset=self.data_offset, shape=(self.height, self.width))
+		for band_start in range(0, self.height, band_height):
+			yield band_start, numpy.array(pixels[band_start:band_start + band_height])[:, :, numpy.newaxis]
+
+	def to_rgb(self, band):
+		return numpy.repeat(band, 3, axis=2)
+
+class PilBandReader:
+	# Fallback for anything the streaming readers don't support: PIL decodes the whole image up front, only the interface is band by band
+	def __init__(self, image_path):
+		self.image_path = image_path
+
+		with Image.open(image_path) as image:
+			self.width, self.height = image.size
+
+	def read_bands(self, band_height):
+		with Image.open(self.image_path) as image:
+			pixels = numpy.asarray(image.convert("RGB"))
+
+		for band_start in range(0, self.height, band_height):
+			yield band_start, pixels[band_start:band_start + band_height]
+
+	def to_rgb(self, band):
+		return numpy.array(band)
+
+def open_band_reader(image_path):
+	for reader_class in [PngBandReader, PgmBandReader]:
+		try:
+			return reader_class(image_path)
+		except (ValueError, IndexError):
+			continue
+
+	return PilBandReader(image_path)
+
+def write_png(output_file, width, height, rows, colour_type = 0):
+	# Minimal streaming PNG encoder (8-bit greyscale or RGB, no filtering) - PIL needs the entire image in memory to encode it
+	def write_chunk(chunk_type, data):
+		output_file.write(struct.pack(">I", len(data)) + chunk_type + data)
+		output_file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+	output_file.write(PngBandReader.PNG_SIGNATURE)
+	write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, colour_type, 0, 0, 0))
+
+	compressor = zlib.compressobj(6)
+	for row in rows:
+		# Every scanline is prefixed by its filter type, 0 meaning none
+		compressed = compressor.compress(b"\x00" + row)
+		if compressed:
+			write_chunk(b"IDAT", compressed)
+
+	write_chunk(b"IDAT", compressor.flush())
+	write_chunk(b"IEND", b"")
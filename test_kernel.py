@@ -0,0 +1,36 @@
+import os
+import glob
+import functools
+import pytest
+
+from PIL import Image
+from solving import load_maze
+from factory import SolverFactory
+from kernel import GridKernelSolver, get_compiled_search_grid, search_grid
+
+# The kernel must expand cells in exactly the order the regular solvers do, so both find the very same path on every bundled maze
+MAZE_PATHS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "mazes", "*.png")))
+
+@functools.lru_cache(maxsize=None)
+def load_grid_maze(maze_path):
+	image = Image.open(maze_path)
+	image.load()
+	return load_maze(image, "grid")
+
+def get_coordinates(path):
+	return path if path == False else [(node.x, node.y) for node in path]
+
+@pytest.mark.parametrize("compiled", [True, False], ids=["compiled", "plain"])
+@pytest.mark.parametrize("method", ["dijkstra", "astar"])
+@pytest.mark.parametrize("maze_path", MAZE_PATHS, ids=os.path.basename)
+def test_kernel_matches_regular_solver(maze_path, method, compiled):
+	if compiled and get_compiled_search_grid() is search_grid:
+		pytest.skip("Numba is not installed")
+
+	maze = load_grid_maze(maze_path)
+	solver = SolverFactory().create_regular(method)
+
+	expected = solver.solve(maze)
+	path = GridKernelSolver(solver, method == "astar", compiled).solve(maze)
+
+	assert get_coordinates(path) == get_coordinates(expected)